@@ -1,15 +1,49 @@
 # app.py
 from __future__ import annotations
 
+import asyncio
 import json
+import os
+import threading
+from contextlib import asynccontextmanager
 from dataclasses import dataclass
-from datetime import date
-from typing import Any, Dict, List, Literal, Optional, Tuple
+from datetime import date, datetime, timedelta
+from typing import (
+    Any, AsyncIterator, Callable, Dict, List, Literal, Optional, Tuple, Type, Union,
+    get_args,
+)
 from fastapi.middleware.cors import CORSMiddleware 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel, Field, validator
 
-from divewise_weather import DiveWiseWeather, OpenMeteoError  # reuse your class as-is
+try:
+    import orjson
+except ImportError:  # falls back to the stdlib encoder
+    orjson = None
+
+from divewise_weather import (  # reuse your class as-is
+    AsyncDiveWiseWeather,
+    BreakerConfig,
+    HedgePolicy,
+    HourlyColumns,
+    OpenMeteoError,
+    PoolConfig,
+    RateLimitConfig,
+    ResponseCache,
+    RetryPolicy,
+    SQLiteResponseCache,
+    TimeoutPolicy,
+    aclose_shared_async_clients,
+    breaker_stats,
+    close_shared_sessions,
+    coalesce_stats,
+    hedge_stats,
+    latency_stats,
+    pool_stats,
+    rate_limit_stats,
+    retry_stats,
+)
 
 
 # =========================
@@ -17,6 +51,7 @@ from divewise_weather import DiveWiseWeather, OpenMeteoError  # reuse your class
 # =========================
 
 FogPolicy = Literal["score", "warn", "caution"]
+HourlyFormat = Literal["rows", "columnar"]
 
 @dataclass(frozen=True)
 class SafetyPolicy:
@@ -171,6 +206,14 @@ class RiskEngine:
         if isinstance(air_c, (int, float)) and air_c < 16:
             tips.append("Cold air — consider thicker wetsuit, hood, gloves.")
 
+        # Data age (non-scoring)
+        stale = (reading or {}).get("staleness") or {}
+        if stale:
+            age_min = max(s.get("age_s") or 0.0 for s in stale.values()) / 60
+            tips.append(f"Conditions data is {age_min:.0f} min old — re-check on site.")
+        if (reading or {}).get("marine_skipped"):
+            tips.append("Sea-state service unavailable — check surge and waves on site.")
+
         status = RiskEngine._map_status(score, hard_unsafe, policy)
         return {
             "status": status,
@@ -180,33 +223,25 @@ class RiskEngine:
         }
 
     @staticmethod
-    def assess_forecast(
-        forecast: Dict[str, Any],
+    def _scan_hours(
+        hourly: HourlyColumns,
         policy: SafetyPolicy,
-        fog_policy: FogPolicy = "score",
-    ) -> Dict[str, Any]:
-        hourly = forecast.get("hourly", []) or []
-        marine = forecast.get("marine_daily", {}) or {}
-
+        fog_policy: FogPolicy,
+    ) -> Tuple[int, bool, List[str]]:
+        """Score, thunderstorm hard stop and reasons from the hourly weather."""
         reasons: List[str] = []
-        tips: List[str] = []
         score = 0
         hard_unsafe = False
-
-        if not hourly:
-            return {
-                "status": "Unknown",
-                "score": None,
-                "reasons": ["No hourly forecast available."],
-                "tips": [],
-            }
-
-        # Scan hours (worst hour contributes)
-        for h in hourly:
-            code = h.get("weather_code")
-            wind = h.get("wind_speed_10m_kmh") or 0.0
-            gust = h.get("wind_gusts_10m_kmh") or 0.0
-            precip = (h.get("precipitation_mm") or 0.0) + (h.get("rain_mm") or 0.0)
+        for code, wind, gust, precip, rain in zip(
+            hourly.column("weather_code"),
+            hourly.column("wind_speed_10m_kmh"),
+            hourly.column("wind_gusts_10m_kmh"),
+            hourly.column("precipitation_mm"),
+            hourly.column("rain_mm"),
+        ):
+            wind = wind or 0.0
+            gust = gust or 0.0
+            precip = (precip or 0.0) + (rain or 0.0)
 
             if policy.thunderstorm_hard_stop and code in (95, 96, 99):
                 reasons.append("Thunderstorm forecast (lightning risk).")
@@ -233,8 +268,15 @@ class RiskEngine:
             elif precip >= policy.precip_mod:
                 reasons.append(f"Moderate rain forecast ({precip:.1f} mm/hr).")
                 score += policy.score_precip_mod
+        return score, hard_unsafe, reasons
 
-        # Marine (daily max/summary)
+    @staticmethod
+    def _scan_marine_day(
+        marine: Dict[str, Any], policy: SafetyPolicy
+    ) -> Tuple[int, List[str]]:
+        """Score and reasons from the marine daily max/summary."""
+        reasons: List[str] = []
+        score = 0
         wave_h = marine.get("wave_height_max_m")
         swell_h = marine.get("swell_wave_height_max_m")
 
@@ -259,6 +301,38 @@ class RiskEngine:
             elif swell_h >= policy.swell_notable:
                 reasons.append(f"Swell up to {swell_h:.2f} m.")
                 score += policy.score_swell_notable
+        return score, reasons
+
+    @staticmethod
+    def assess_forecast(
+        forecast: Dict[str, Any],
+        policy: SafetyPolicy,
+        fog_policy: FogPolicy = "score",
+    ) -> Dict[str, Any]:
+        hourly = forecast.get("hourly", []) or []
+        if not isinstance(hourly, HourlyColumns):
+            hourly = HourlyColumns.from_rows(hourly)
+        marine = forecast.get("marine_daily", {}) or {}
+        tips: List[str] = []
+
+        if not hourly:
+            return {
+                "status": "Unknown",
+                "score": None,
+                "reasons": ["No hourly forecast available."],
+                "tips": [],
+            }
+
+        # Scan hours (worst hour contributes)
+        score, hard_unsafe, reasons = RiskEngine._scan_hours(hourly, policy, fog_policy)
+
+        # Marine (daily max/summary)
+        marine_score, marine_reasons = RiskEngine._scan_marine_day(marine, policy)
+        score += marine_score
+        reasons += marine_reasons
+
+        if forecast.get("marine_skipped"):
+            tips.append("Sea-state service unavailable — check surge and waves on site.")
 
         status = RiskEngine._map_status(score, hard_unsafe, policy)
         return {
@@ -268,26 +342,194 @@ class RiskEngine:
             "tips": RiskEngine._dedupe(tips),
         }
 
+    @staticmethod
+    def hourly_timeline(
+        forecast: Dict[str, Any],
+        policy: SafetyPolicy,
+        fog_policy: FogPolicy = "score",
+    ) -> List[Dict[str, Any]]:
+        """
+        Per-hour score and status: the hour's own weather plus its marine
+        points, by the same rules assess_forecast applies across the day.
+
+        Marine points come from the hour's own wave and swell heights when the
+        forecast carries hourly marine columns, so a calm morning is not marked
+        down for an afternoon swell; otherwise every hour gets the day's.
+        """
+        hourly = forecast.get("hourly", []) or []
+        if not isinstance(hourly, HourlyColumns):
+            hourly = HourlyColumns.from_rows(hourly)
+        day_score, _ = RiskEngine._scan_marine_day(
+            forecast.get("marine_daily", {}) or {}, policy
+        )
+        if "wave_height_m" in hourly.columns:
+            marine_points: Dict[Tuple[Any, Any], int] = {}  # same rules, memoized per (wave, swell)
+
+            def marine_score(wave: Any, swell: Any) -> int:
+                key = (wave, swell)
+                if key not in marine_points:
+                    marine_points[key], _ = RiskEngine._scan_marine_day(
+                        {"wave_height_max_m": wave, "swell_wave_height_max_m": swell}, policy
+                    )
+                return marine_points[key]
+        else:
+            def marine_score(wave: Any, swell: Any) -> int:
+                return day_score
+
+        timeline = []
+        for ts, code, wind, gust, precip, rain, wave, swell in zip(
+            hourly.column("time"),
+            hourly.column("weather_code"),
+            hourly.column("wind_speed_10m_kmh"),
+            hourly.column("wind_gusts_10m_kmh"),
+            hourly.column("precipitation_mm"),
+            hourly.column("rain_mm"),
+            hourly.column("wave_height_m"),
+            hourly.column("swell_wave_height_m"),
+        ):
+            wind = wind or 0.0
+            gust = gust or 0.0
+            precip = (precip or 0.0) + (rain or 0.0)
+            hard_unsafe = policy.thunderstorm_hard_stop and code in (95, 96, 99)
+            score = marine_score(wave, swell)
+
+            if code in (45, 48):
+                if fog_policy == "score":
+                    score += policy.score_fog_forecast
+                elif fog_policy == "caution":
+                    score = max(score, policy.band_caution_min)
+
+            if wind >= policy.wind_strong or gust >= policy.gust_strong:
+                score += policy.score_wind_strong
+            elif wind >= policy.wind_mod or gust >= policy.gust_mod:
+                score += policy.score_wind_mod
+
+            if precip >= policy.precip_heavy:
+                score += policy.score_precip_heavy
+            elif precip >= policy.precip_mod:
+                score += policy.score_precip_mod
+
+            timeline.append({
+                "time": ts,
+                "score": 100 if hard_unsafe else int(score),
+                "status": RiskEngine._map_status(score, hard_unsafe, policy),
+            })
+        return timeline
+
+    @staticmethod
+    def find_windows(
+        timeline: List[Dict[str, Any]],
+        min_hours: int = 2,
+        top_k: int = 3,
+        daylight: Optional[Dict[str, Tuple[Optional[str], Optional[str]]]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Top ``top_k`` runs of at least ``min_hours`` consecutive "Safe" hours
+        (every hour below the caution band), found in one pass.
+
+        ``daylight`` maps a date to its (sunrise, sunset) local stamps; an hour
+        counts as daylight when it starts inside [sunrise, sunset). Each run
+        reports its best ``min_hours`` slot, picked by a sliding window (most
+        daylight, then lowest total score), and runs are ranked by that slot,
+        then by length.
+        """
+        def in_daylight(ts: str) -> int:
+            sunrise, sunset = (daylight or {}).get(ts[:10], (None, None))
+            return int(bool(sunrise and sunset and sunrise <= ts < sunset))
+
+        scores = [hour["score"] for hour in timeline]
+        light = [in_daylight(hour["time"]) for hour in timeline]
+
+        def window(first: int, stop: int) -> Dict[str, Any]:
+            total = sum(scores[first:first + min_hours])
+            lit = sum(light[first:first + min_hours])
+            best = (-lit, total, first)
+            for j in range(first + min_hours, stop):
+                total += scores[j] - scores[j - min_hours]
+                lit += light[j] - light[j - min_hours]
+                best = min(best, (-lit, total, j - min_hours + 1))
+            slot_lit, slot_total, slot_first = best
+            return {
+                "start": timeline[first]["time"],
+                "end": RiskEngine._hour_end(timeline[stop - 1]["time"]),
+                "hours": stop - first,
+                "max_score": max(scores[first:stop]),
+                "mean_score": round(sum(scores[first:stop]) / (stop - first), 1),
+                "daylight_hours": sum(light[first:stop]),
+                "best_slot": {
+                    "start": timeline[slot_first]["time"],
+                    "end": RiskEngine._hour_end(timeline[slot_first + min_hours - 1]["time"]),
+                    "score": slot_total,
+                    "daylight_hours": -slot_lit,
+                },
+            }
+
+        windows = []
+        first = None
+        for i in range(len(timeline) + 1):
+            if i < len(timeline) and timeline[i]["status"] == "Safe":
+                if first is None:
+                    first = i
+                continue
+            if first is not None and i - first >= min_hours:
+                windows.append(window(first, i))
+            first = None
+
+        windows.sort(key=lambda w: (
+            -w["best_slot"]["daylight_hours"], w["best_slot"]["score"], -w["hours"], w["start"]
+        ))
+        return windows[:top_k]
+
+    @staticmethod
+    def _hour_end(ts: str) -> str:
+        return (datetime.fromisoformat(ts) + timedelta(hours=1)).isoformat(timespec="minutes")
+
+    @staticmethod
+    def summarize_days(days: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Overall verdict for assessed days: the worst known day sets the status."""
+        rank = {"Unknown": 0, "Safe": 1, "Caution": 2, "Unsafe": 3}
+        by_status: Dict[str, int] = {}
+        status = "Unknown"
+        best = worst = None
+        for day in days:
+            safety = day["safety"]
+            by_status[safety["status"]] = by_status.get(safety["status"], 0) + 1
+            if rank[safety["status"]] > rank[status]:
+                status = safety["status"]
+            if safety["score"] is None:
+                continue
+            if best is None or safety["score"] < best["safety"]["score"]:
+                best = day
+            if worst is None or safety["score"] > worst["safety"]["score"]:
+                worst = day
+        return {
+            "status": status,
+            "best_date": best["date"] if best else None,
+            "worst_date": worst["date"] if worst else None,
+            "days_by_status": by_status,
+        }
+
 
 # ============
 # API schemas
 # ============
 
 class RealtimeRequest(BaseModel):
-    lat: float = Field(..., description="Latitude")
-    lon: float = Field(..., description="Longitude")
+    lat: float = Field(..., ge=-90, le=90, description="Latitude")
+    lon: float = Field(..., ge=-180, le=180, description="Longitude")
     fog_policy: FogPolicy = Field("score", description="'score'|'warn'|'caution'")
     include_marine: bool = Field(True, description="Fetch marine data if available")
     timeout: int = Field(15, ge=1, le=60)
 
 
 class ForecastRequest(BaseModel):
-    lat: float
-    lon: float
+    lat: float = Field(..., ge=-90, le=90, description="Latitude")
+    lon: float = Field(..., ge=-180, le=180, description="Longitude")
     date: str = Field(..., description="YYYY-MM-DD (local)")
     fog_policy: FogPolicy = Field("score", description="'score'|'warn'|'caution'")
     include_marine: bool = Field(True)
     timeout: int = Field(15, ge=1, le=60)
+    format: HourlyFormat = Field("rows", description="'rows'|'columnar' hourly layout")
 
     @validator("date")
     def _validate_date(cls, v: str) -> str:
@@ -298,6 +540,100 @@ class ForecastRequest(BaseModel):
         return v
 
 
+# A full batch with marine costs 2 * MAX_BATCH_SITES rate-limit tokens, which
+# RateLimitConfig's default burst covers. Streams go out a window at a time,
+# so they may be longer.
+MAX_BATCH_SITES = 200
+MAX_STREAM_SITES = 2000
+
+
+class Site(BaseModel):
+    lat: float = Field(..., ge=-90, le=90, description="Latitude")
+    lon: float = Field(..., ge=-180, le=180, description="Longitude")
+
+
+def _limit_batch_size(stream: bool, values: Dict[str, Any]) -> bool:
+    sites = values.get("sites") or []
+    if not stream and len(sites) > MAX_BATCH_SITES:
+        raise ValueError(f"at most {MAX_BATCH_SITES} sites per batch; use stream=true for more")
+    return stream
+
+
+class RealtimeBatchRequest(BaseModel):
+    sites: List[Site] = Field(..., min_length=1, max_length=MAX_STREAM_SITES)
+    fog_policy: FogPolicy = Field("score", description="'score'|'warn'|'caution'")
+    include_marine: bool = Field(True, description="Fetch marine data if available")
+    timeout: int = Field(15, ge=1, le=60)
+    stream: bool = Field(False, description="Stream NDJSON items as they complete")
+
+    @validator("stream", always=True)
+    def _check_batch_size(cls, v: bool, values: Dict[str, Any]) -> bool:
+        return _limit_batch_size(v, values)
+
+
+class ForecastBatchRequest(BaseModel):
+    sites: List[Site] = Field(..., min_length=1, max_length=MAX_STREAM_SITES)
+    date: str = Field(..., description="YYYY-MM-DD (local)")
+    fog_policy: FogPolicy = Field("score", description="'score'|'warn'|'caution'")
+    include_marine: bool = Field(True)
+    timeout: int = Field(15, ge=1, le=60)
+    stream: bool = Field(False, description="Stream NDJSON items as they complete")
+    format: HourlyFormat = Field("rows", description="'rows'|'columnar' hourly layout")
+
+    @validator("date")
+    def _validate_date(cls, v: str) -> str:
+        try:
+            _ = date.fromisoformat(v)
+        except ValueError:
+            raise ValueError("date must be YYYY-MM-DD")
+        return v
+
+    @validator("stream", always=True)
+    def _check_batch_size(cls, v: bool, values: Dict[str, Any]) -> bool:
+        return _limit_batch_size(v, values)
+
+
+class ForecastRangeRequest(BaseModel):
+    lat: float = Field(..., ge=-90, le=90, description="Latitude")
+    lon: float = Field(..., ge=-180, le=180, description="Longitude")
+    start_date: str = Field(..., description="YYYY-MM-DD (local), first day")
+    end_date: str = Field(..., description="YYYY-MM-DD (local), last day (inclusive)")
+    fog_policy: FogPolicy = Field("score", description="'score'|'warn'|'caution'")
+    include_marine: bool = Field(True)
+    timeout: int = Field(15, ge=1, le=60)
+    format: HourlyFormat = Field("rows", description="'rows'|'columnar' hourly layout")
+
+    @validator("start_date", "end_date")
+    def _validate_date(cls, v: str) -> str:
+        try:
+            _ = date.fromisoformat(v)
+        except ValueError:
+            raise ValueError("date must be YYYY-MM-DD")
+        return v
+
+
+class DiveWindowsRequest(BaseModel):
+    lat: float = Field(..., ge=-90, le=90, description="Latitude")
+    lon: float = Field(..., ge=-180, le=180, description="Longitude")
+    start_date: str = Field(..., description="YYYY-MM-DD (local), first day")
+    end_date: Optional[str] = Field(None, description="YYYY-MM-DD (local), defaults to start")
+    min_hours: int = Field(2, ge=1, le=24, description="Shortest window worth reporting")
+    top_k: int = Field(3, ge=1, le=20)
+    fog_policy: FogPolicy = Field("score", description="'score'|'warn'|'caution'")
+    include_marine: bool = Field(True)
+    timeout: int = Field(15, ge=1, le=60)
+
+    @validator("start_date", "end_date")
+    def _validate_date(cls, v: Optional[str]) -> Optional[str]:
+        if v is None:
+            return v
+        try:
+            _ = date.fromisoformat(v)
+        except ValueError:
+            raise ValueError("date must be YYYY-MM-DD")
+        return v
+
+
 class SafetyResponse(BaseModel):
     status: Literal["Safe", "Caution", "Unsafe", "Unknown"]
     score: Optional[int]
@@ -309,6 +645,8 @@ class RealtimeResponse(BaseModel):
     coord: Dict[str, float]
     weather: Dict[str, Any]
     marine: Optional[Dict[str, Any]] = None
+    marine_skipped: Optional[str] = None
+    staleness: Optional[Dict[str, Dict[str, Any]]] = None
     safety: SafetyResponse
 
 
@@ -316,16 +654,267 @@ class ForecastResponse(BaseModel):
     coord: Dict[str, float]
     date: str
     daily: Dict[str, Any]
-    hourly: List[Dict[str, Any]]
+    # rows: one object per hour; columnar: one array per field
+    hourly: Union[List[Dict[str, Any]], Dict[str, List[Any]]]
     marine_daily: Optional[Dict[str, Any]] = None
+    marine_skipped: Optional[str] = None
+    staleness: Optional[Dict[str, Dict[str, Any]]] = None
     safety: SafetyResponse
 
 
+class RealtimeBatchItem(BaseModel):
+    index: int
+    ok: bool
+    result: Optional[RealtimeResponse] = None
+    error: Optional[str] = None
+
+
+class ForecastBatchItem(BaseModel):
+    index: int
+    ok: bool
+    result: Optional[ForecastResponse] = None
+    error: Optional[str] = None
+
+
+class RealtimeBatchResponse(BaseModel):
+    results: List[RealtimeBatchItem]
+
+
+class ForecastBatchResponse(BaseModel):
+    results: List[ForecastBatchItem]
+
+
+class ForecastDayResponse(BaseModel):
+    date: str
+    daily: Dict[str, Any]
+    hourly: Union[List[Dict[str, Any]], Dict[str, List[Any]]]
+    marine_daily: Optional[Dict[str, Any]] = None
+    safety: SafetyResponse
+
+
+class RangeSummaryResponse(BaseModel):
+    status: Literal["Safe", "Caution", "Unsafe", "Unknown"]
+    best_date: Optional[str] = None
+    worst_date: Optional[str] = None
+    days_by_status: Dict[str, int]
+
+
+class HourRiskResponse(BaseModel):
+    time: str
+    score: int
+    status: Literal["Safe", "Caution", "Unsafe", "Unknown"]
+
+
+class DiveSlotResponse(BaseModel):
+    start: str
+    end: str
+    score: int
+    daylight_hours: int
+
+
+class DiveWindowResponse(BaseModel):
+    start: str
+    end: str
+    hours: int
+    max_score: int
+    mean_score: float
+    daylight_hours: int
+    best_slot: DiveSlotResponse
+
+
+class DiveWindowsResponse(BaseModel):
+    coord: Dict[str, float]
+    start_date: str
+    end_date: str
+    timeline: List[HourRiskResponse]
+    windows: List[DiveWindowResponse]
+    marine_skipped: Optional[str] = None
+    staleness: Optional[Dict[str, Dict[str, Any]]] = None
+
+
+class ForecastRangeResponse(BaseModel):
+    coord: Dict[str, float]
+    start_date: str
+    end_date: str
+    days: List[ForecastDayResponse]
+    summary: RangeSummaryResponse
+    marine_skipped: Optional[str] = None
+    staleness: Optional[Dict[str, Dict[str, Any]]] = None
+
+
+# ==========
+# Responses
+# ==========
+
+# Skip pydantic re-validation of responses we built ourselves (opt-in).
+TRUST_RESPONSES = os.environ.get("DIVEWISE_TRUST_RESPONSES") == "1"
+
+
+def dumps(content: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson when it is installed."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def _model_of(annotation: Any) -> Optional[Type[BaseModel]]:
+    """The BaseModel inside ``annotation`` (also through Optional[...] / List[...])."""
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return annotation
+    for arg in get_args(annotation):
+        model = _model_of(arg)
+        if model is not None:
+            return model
+    return None
+
+
+def shape(model: Type[BaseModel], data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    ``data`` laid out the way ``model`` serializes it (field order, defaults
+    for missing optional fields, extra keys dropped) without validating it.
+
+    :raises ValueError: if ``data`` lacks one of ``model``'s required fields.
+    """
+    out: Dict[str, Any] = {}
+    for name, field in model.model_fields.items():
+        if name in data:
+            value = data[name]
+        elif field.is_required():
+            raise ValueError(f"{model.__name__}.{name} is required but missing")
+        else:
+            value = field.get_default(call_default_factory=True)
+        sub = _model_of(field.annotation)
+        if sub is not None and value is not None:
+            if isinstance(value, list):
+                value = [shape(sub, v) for v in value]
+            else:
+                value = shape(sub, value)
+        out[name] = value
+    return out
+
+
+def respond(model: Type[BaseModel], data: Dict[str, Any]) -> Any:
+    """
+    With TRUST_RESPONSES, send ``data`` straight to the encoder; otherwise let
+    FastAPI validate it against the endpoint's response_model as usual.
+    """
+    if not TRUST_RESPONSES:
+        return data
+    return FastJSONResponse(shape(model, data))
+
+
+# =================
+# Upstream clients
+# =================
+
+class ClientRegistry:
+    """
+    Application-lifetime weather clients, one per (timeout, include_marine).
+
+    All clients share the same connection pool, response cache and upstream
+    policies, so keep-alive connections and cached payloads survive across
+    requests.
+    """
+
+    def __init__(
+        self,
+        pool: Optional[PoolConfig] = None,
+        cache: Optional[ResponseCache] = None,
+        hedge: Optional[HedgePolicy] = None,
+        breaker: Optional[BreakerConfig] = None,
+        timeouts: Optional[TimeoutPolicy] = None,
+        rate_limit: Optional[RateLimitConfig] = None,
+        retry: Optional[RetryPolicy] = None,
+    ):
+        self.pool = pool or PoolConfig()
+        self.cache = cache or ResponseCache()
+        self.hedge = hedge or HedgePolicy()
+        self.breaker = breaker or BreakerConfig()
+        self.timeouts = timeouts or TimeoutPolicy()
+        self.rate_limit = rate_limit or RateLimitConfig()
+        self.retry = retry or RetryPolicy()
+        self._clients: Dict[Tuple[int, bool], AsyncDiveWiseWeather] = {}
+        self._lock = threading.Lock()
+
+    def get(self, timeout: int, include_marine: bool) -> AsyncDiveWiseWeather:
+        key = (timeout, include_marine)
+        client = self._clients.get(key)
+        if client is None:
+            with self._lock:
+                client = self._clients.get(key)
+                if client is None:
+                    client = AsyncDiveWiseWeather(
+                        timeout=timeout,
+                        include_marine=include_marine,
+                        pool=self.pool,
+                        cache=self.cache,
+                        hedge=self.hedge,
+                        breaker=self.breaker,
+                        timeouts=self.timeouts,
+                        rate_limit=self.rate_limit,
+                        retry=self.retry,
+                    )
+                    self._clients[key] = client
+        return client
+
+    async def aclose(self) -> None:
+        with self._lock:
+            self._clients.clear()
+        await asyncio.to_thread(self.cache.close)  # flushes queued disk writes
+        await aclose_shared_async_clients()
+        close_shared_sessions()
+
+
+# Upstream latency SLO: no single-site request waits longer than this on
+# Open-Meteo, whatever `timeout` it asked for.
+UPSTREAM_SLO_S = float(os.environ.get("DIVEWISE_UPSTREAM_SLO_S", "8"))
+# Budget of a batch (shared by its chunks) or of each streamed window of 50
+# sites; long enough for a batch to queue for rate-limit tokens.
+BATCH_SLO_S = float(os.environ.get("DIVEWISE_BATCH_SLO_S", "30"))
+
+
+def build_cache() -> ResponseCache:
+    """
+    In-memory cache per worker, or a host-wide SQLite cache when
+    DIVEWISE_CACHE_PATH is set (survives restarts, shared by all workers).
+    """
+    options = {"stale_while_revalidate": 600.0, "stale_if_error": 3600.0}
+    path = os.environ.get("DIVEWISE_CACHE_PATH")
+    if path:
+        return SQLiteResponseCache(path, **options)
+    return ResponseCache(**options)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    app.state.clients = ClientRegistry(
+        cache=build_cache(),
+        timeouts=TimeoutPolicy(deadline_s=UPSTREAM_SLO_S, batch_deadline_s=BATCH_SLO_S),
+        # DIVEWISE_RATE_LIMIT_PATH shares one upstream budget across all workers
+        rate_limit=RateLimitConfig(path=os.environ.get("DIVEWISE_RATE_LIMIT_PATH")),
+    )
+    try:
+        yield
+    finally:
+        await app.state.clients.aclose()
+
+
 # =========
 # FastAPI
 # =========
 
-app = FastAPI(title="DiveWise Weather API", version="1.0.0")
+app = FastAPI(
+    title="DiveWise Weather API",
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse,
+)
 
 # Separate policies allow different tuning per mode
 REALTIME_POLICY = SafetyPolicy()
@@ -347,31 +936,176 @@ def health():
     return {"ok": True}
 
 
+@app.get("/stats")
+def stats(request: Request):
+    """Upstream counters of this worker process (each worker keeps its own)."""
+    return {
+        "pool": pool_stats(),
+        "cache": request.app.state.clients.cache.stats(),
+        "coalesce": coalesce_stats(),
+        "latency": latency_stats(),
+        "hedge": hedge_stats(),
+        "retry": retry_stats(),
+        "breaker": breaker_stats(),
+        "rate_limit": rate_limit_stats(),
+    }
+
+
 @app.post("/realtime", response_model=RealtimeResponse)
-def realtime(req: RealtimeRequest):
-    client = DiveWiseWeather(timeout=req.timeout, include_marine=req.include_marine)
+async def realtime(req: RealtimeRequest, request: Request):
+    client = request.app.state.clients.get(req.timeout, req.include_marine)
     try:
-        data = client.get_realtime(req.lat, req.lon)
+        data = await client.get_realtime(req.lat, req.lon)
     except OpenMeteoError as e:
         raise HTTPException(status_code=502, detail=f"Upstream error: {e}")
 
     safety = RiskEngine.assess_realtime(data, REALTIME_POLICY, fog_policy=req.fog_policy)
     data_out = dict(data)
     data_out["safety"] = safety
-    return data_out
+    return respond(RealtimeResponse, data_out)
 
 
 @app.post("/forecast", response_model=ForecastResponse)
-def forecast(req: ForecastRequest):
-    client = DiveWiseWeather(timeout=req.timeout, include_marine=req.include_marine)
+async def forecast(req: ForecastRequest, request: Request):
+    client = request.app.state.clients.get(req.timeout, req.include_marine)
     try:
-        data = client.get_forecast_for_date(req.lat, req.lon, req.date)
+        data = await client.get_forecast_for_date(req.lat, req.lon, req.date)
     except OpenMeteoError as e:
         raise HTTPException(status_code=502, detail=f"Upstream error: {e}")
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
     safety = RiskEngine.assess_forecast(data, FORECAST_POLICY, fog_policy=req.fog_policy)
-    data_out = dict(data)
+    data_out = expand_hourly(data, req.format)
     data_out["safety"] = safety
+    return respond(ForecastResponse, data_out)
+
+
+@app.post("/forecast/range", response_model=ForecastRangeResponse)
+async def forecast_range(req: ForecastRangeRequest, request: Request):
+    client = request.app.state.clients.get(req.timeout, req.include_marine)
+    try:
+        data = await client.get_forecast_range(req.lat, req.lon, req.start_date, req.end_date)
+    except OpenMeteoError as e:
+        raise HTTPException(status_code=502, detail=f"Upstream error: {e}")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    days = []
+    for day in data["days"]:
+        safety = RiskEngine.assess_forecast(
+            dict(day, marine_skipped=data.get("marine_skipped")),
+            FORECAST_POLICY,
+            fog_policy=req.fog_policy,
+        )
+        day_out = expand_hourly(day, req.format)
+        day_out["safety"] = safety
+        days.append(day_out)
+    data_out = dict(data)
+    data_out["days"] = days
+    data_out["summary"] = RiskEngine.summarize_days(days)
+    return respond(ForecastRangeResponse, data_out)
+
+
+@app.post("/forecast/windows", response_model=DiveWindowsResponse)
+async def forecast_windows(req: DiveWindowsRequest, request: Request):
+    client = request.app.state.clients.get(req.timeout, req.include_marine)
+    try:
+        data = await client.get_forecast_range(
+            req.lat, req.lon, req.start_date, req.end_date or req.start_date
+        )
+    except OpenMeteoError as e:
+        raise HTTPException(status_code=502, detail=f"Upstream error: {e}")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    timeline: List[Dict[str, Any]] = []
+    daylight = {}
+    for day in data["days"]:
+        timeline += RiskEngine.hourly_timeline(day, FORECAST_POLICY, fog_policy=req.fog_policy)
+        daylight[day["date"]] = (day["daily"]["sunrise_local"], day["daily"]["sunset_local"])
+    data_out = {key: value for key, value in data.items() if key != "days"}
+    data_out["timeline"] = timeline
+    data_out["windows"] = RiskEngine.find_windows(timeline, req.min_hours, req.top_k, daylight)
+    return respond(DiveWindowsResponse, data_out)
+
+
+def expand_hourly(data: Dict[str, Any], fmt: HourlyFormat = "rows") -> Dict[str, Any]:
+    """Copy of ``data`` with its HourlyColumns turned into the response layout."""
+    data_out = dict(data)
+    hourly = data_out.get("hourly")
+    if isinstance(hourly, HourlyColumns):
+        data_out["hourly"] = hourly.to_dict() if fmt == "columnar" else hourly.to_rows()
     return data_out
+
+
+def _batch_item(
+    index: int,
+    data: Any,
+    assess: Callable[[Dict[str, Any]], Dict[str, Any]],
+    fmt: HourlyFormat = "rows",
+) -> Dict[str, Any]:
+    if isinstance(data, OpenMeteoError):
+        return {"index": index, "ok": False, "error": f"Upstream error: {data}"}
+    data_out = expand_hourly(data, fmt)
+    data_out["safety"] = assess(data)
+    return {"index": index, "ok": True, "result": data_out}
+
+
+def _ndjson_items(
+    items: AsyncIterator[Tuple[int, Any]],
+    assess: Callable[[Dict[str, Any]], Dict[str, Any]],
+    fmt: HourlyFormat = "rows",
+) -> StreamingResponse:
+    """One JSON line per site, written as soon as its batch completes."""
+
+    async def lines():
+        async for index, data in items:
+            yield dumps(_batch_item(index, data, assess, fmt)) + b"\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+@app.post("/realtime/batch", response_model=RealtimeBatchResponse)
+async def realtime_batch(req: RealtimeBatchRequest, request: Request):
+    client = request.app.state.clients.get(req.timeout, req.include_marine)
+    coords = [(site.lat, site.lon) for site in req.sites]
+
+    def assess(d: Dict[str, Any]) -> Dict[str, Any]:
+        return RiskEngine.assess_realtime(d, REALTIME_POLICY, fog_policy=req.fog_policy)
+
+    if req.stream:
+        return _ndjson_items(client.iter_realtime_many(coords), assess)
+
+    data = await client.get_realtime_many(coords, return_exceptions=True)
+    return respond(
+        RealtimeBatchResponse,
+        {"results": [_batch_item(i, d, assess) for i, d in enumerate(data)]},
+    )
+
+
+@app.post("/forecast/batch", response_model=ForecastBatchResponse)
+async def forecast_batch(req: ForecastBatchRequest, request: Request):
+    client = request.app.state.clients.get(req.timeout, req.include_marine)
+    coords = [(site.lat, site.lon) for site in req.sites]
+
+    def assess(d: Dict[str, Any]) -> Dict[str, Any]:
+        return RiskEngine.assess_forecast(d, FORECAST_POLICY, fog_policy=req.fog_policy)
+
+    try:
+        if req.stream:
+            return _ndjson_items(
+                client.iter_forecast_for_date_many(coords, req.date), assess, req.format
+            )
+        data = await client.get_forecast_for_date_many(coords, req.date, return_exceptions=True)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return respond(
+        ForecastBatchResponse,
+        {
+            "results": [
+                _batch_item(i, d, assess, req.format) for i, d in enumerate(data)
+            ]
+        },
+    )
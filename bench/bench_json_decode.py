@@ -0,0 +1,108 @@
+"""
+Microbenchmark: decoding Open-Meteo payloads.
+
+Compares ``requests``' ``Response.json()`` (charset detection + stdlib), stdlib
+``json.loads`` on the raw bytes and, when installed, ``orjson.loads`` on the
+fixtures in tests/fixtures. ``--record`` refreshes those fixtures from the live
+API with the same query parameters the clients send.
+
+    python bench/bench_json_decode.py [--number 50] [--record]
+"""
+
+import argparse
+import json
+import os
+import sys
+import timeit
+from datetime import date, timedelta
+from typing import Any, Callable, Dict, List, Tuple
+
+import requests
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from divewise_weather import _DiveWiseBase as Base  # noqa: E402
+
+try:
+    import orjson
+except ImportError:  # optional
+    orjson = None
+
+FIXTURES = os.path.join(ROOT, "tests", "fixtures")
+
+# (file, endpoint, params) for --record; Malta plus a strip of 50 coastal sites
+SITE = (35.9, 14.5)
+BATCH = [(round(35.5 + i * 0.1, 2), round(12.0 + i * 0.15, 2)) for i in range(50)]
+
+
+def _recordings(start: date) -> List[Tuple[str, str, Dict[str, Any]]]:
+    end = start + timedelta(days=Base.MAX_RANGE_DAYS - 1)
+    batch = Base._forecast_weather_params(0.0, 0.0, start, start + timedelta(days=1))
+    batch["latitude"] = ",".join(str(lat) for lat, _ in BATCH)
+    batch["longitude"] = ",".join(str(lon) for _, lon in BATCH)
+    return [
+        ("realtime_weather.json", Base.WEATHER_BASE, Base._realtime_weather_params(*SITE)),
+        ("realtime_marine.json", Base.MARINE_BASE, Base._realtime_marine_params(*SITE)),
+        ("forecast_weather_16d.json", Base.WEATHER_BASE,
+         Base._forecast_weather_params(*SITE, start, end)),
+        ("forecast_marine_16d.json", Base.MARINE_BASE,
+         Base._forecast_marine_params(*SITE, start, end)),
+        ("forecast_weather_50x2d.json", Base.WEATHER_BASE, batch),
+    ]
+
+
+def record() -> None:
+    for name, url, params in _recordings(date.today()):
+        r = requests.get(url, params=params, timeout=30)
+        r.raise_for_status()
+        with open(os.path.join(FIXTURES, name), "wb") as f:
+            f.write(r.content)
+        print(f"recorded {name} ({len(r.content) / 1024:.0f} KiB)")
+
+
+def _response(body: bytes) -> requests.Response:
+    """A requests.Response as _get receives it (no declared charset)."""
+    r = requests.Response()
+    r._content = body
+    r.status_code = 200
+    r.headers["Content-Type"] = "application/json"
+    return r
+
+
+def _decoders(body: bytes) -> Dict[str, Callable[[], Any]]:
+    decoders = {
+        "requests r.json()": lambda: _response(body).json(),
+        "json.loads(bytes)": lambda: json.loads(body),
+    }
+    if orjson is not None:
+        decoders["orjson.loads"] = lambda: orjson.loads(body)
+    return decoders
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--number", type=int, default=50, help="decodes per timing run")
+    parser.add_argument("--record", action="store_true", help="refresh fixtures from Open-Meteo")
+    args = parser.parse_args()
+    if args.record:
+        record()
+
+    for name in sorted(os.listdir(FIXTURES)):
+        with open(os.path.join(FIXTURES, name), "rb") as f:
+            body = f.read()
+        expected = json.loads(body)
+        print(f"\n{name} ({len(body) / 1024:.0f} KiB)")
+        baseline = None
+        for label, decode in _decoders(body).items():
+            assert decode() == expected, label
+            best = min(timeit.repeat(decode, number=args.number, repeat=5)) / args.number
+            baseline = baseline or best
+            print(
+                f"  {label:<20} {best * 1e3:8.3f} ms  "
+                f"{len(body) / best / 1e6:7.1f} MB/s  x{baseline / best:.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,28 +1,1718 @@
 # divewise_weather.py
-# requirements: requests>=2.28
+# requirements: requests>=2.28 (httpx>=0.24 for AsyncDiveWiseWeather; orjson optional)
 from __future__ import annotations
 
+import asyncio
+import bisect
+import json
+import queue
+import random
+import sqlite3
+import threading
+import time
+import weakref
+import zlib
+from collections import OrderedDict, deque
+from concurrent.futures import (
+    FIRST_COMPLETED, Future, ThreadPoolExecutor, TimeoutError as FutureTimeout, wait,
+)
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass
+from datetime import datetime, date, timedelta
+from email.utils import parsedate_to_datetime
+from itertools import chain, repeat
+from typing import (
+    Any, AsyncIterator, Awaitable, Callable, Deque, Dict, Hashable, Iterable, Iterator,
+    NamedTuple, Optional, List, Sequence, Tuple, Union,
+)
+
 import requests
-from datetime import datetime, date
-from typing import Any, Dict, Optional, List
+from requests.adapters import HTTPAdapter
+
+try:
+    import httpx
+except ImportError:  # async client is optional
+    httpx = None
+
+try:
+    import orjson
+except ImportError:  # stdlib json is the fallback decoder
+    orjson = None
 
 
 class OpenMeteoError(RuntimeError):
     """Raised when Open-Meteo returns an error or the response is invalid."""
 
+    def __init__(self, message: str, status: Optional[int] = None):
+        super().__init__(message)
+        # HTTP status of the upstream response, when there was one
+        self.status = status
+
+
+# ---------------------------
+# JSON decoding
+# ---------------------------
+
+# decodes a raw (UTF-8) response body; must raise ValueError on bad input
+JSONDecoder = Callable[[bytes], Any]
+
+
+def default_json_decoder() -> JSONDecoder:
+    """orjson.loads when installed, else json.loads (both accept bytes)."""
+    return orjson.loads if orjson is not None else json.loads
 
-class DiveWiseWeather:
+
+_loads = default_json_decoder()
+
+
+# ---------------------------
+# Connection pooling
+# ---------------------------
+
+@dataclass(frozen=True)
+class PoolConfig:
     """
-    Lightweight client for Open-Meteo weather & marine data.
+    Keep-alive connection pool settings for the upstream HTTP session.
 
-    Endpoints:
-      - Weather: https://api.open-meteo.com/v1/forecast
-      - Marine : https://marine-api.open-meteo.com/v1/marine
+    Clients built with equal configs share one session (and its sockets).
+    """
+
+    # number of per-host pools kept (weather + marine hosts → 2 in practice)
+    host_pools: int = 4
+    # idle keep-alive connections retained per host
+    max_keepalive: int = 32
+    # hard cap on concurrent connections per host; callers wait when reached
+    max_per_host: Optional[int] = None
+    # idle seconds before a keep-alive connection is dropped (async client only;
+    # urllib3 keeps idle sockets until the server closes them)
+    keepalive_expiry: float = 30.0
+
+
+_SESSIONS: Dict[PoolConfig, requests.Session] = {}
+_SESSIONS_LOCK = threading.Lock()
+
+
+def shared_session(config: PoolConfig) -> requests.Session:
+    """Return the process-wide pooled session for ``config``, creating it once."""
+    with _SESSIONS_LOCK:
+        session = _SESSIONS.get(config)
+        if session is None:
+            adapter = HTTPAdapter(
+                pool_connections=config.host_pools,
+                pool_maxsize=config.max_per_host or config.max_keepalive,
+                pool_block=config.max_per_host is not None,
+            )
+            session = requests.Session()
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _SESSIONS[config] = session
+        return session
+
+
+def close_shared_sessions() -> None:
+    """Close every pooled session (drops keep-alive sockets). Safe to call twice."""
+    with _SESSIONS_LOCK:
+        sessions = list(_SESSIONS.values())
+        _SESSIONS.clear()
+    for session in sessions:
+        session.close()
+
+
+def pool_stats(config: Optional[PoolConfig] = None) -> Dict[str, Dict[str, int]]:
+    """
+    Connection reuse counters of the sync sessions and the async clients.
+
+    ``misses`` counts new TCP/TLS connections, ``hits`` requests served on
+    an already-open keep-alive connection.
+    """
+    return {"sync": _session_pool_stats(config), "async": _async_pool_stats(config)}
+
+
+def _reuse(requests_total: int, connections: int) -> Dict[str, int]:
+    return {
+        "requests": requests_total,
+        "hits": max(requests_total - connections, 0),
+        "misses": connections,
+    }
+
+
+def _session_pool_stats(config: Optional[PoolConfig]) -> Dict[str, int]:
+    """Counters summed over the live urllib3 host pools."""
+    with _SESSIONS_LOCK:
+        if config is None:
+            sessions = list(_SESSIONS.values())
+        else:
+            sessions = [_SESSIONS[config]] if config in _SESSIONS else []
+    requests_total = connections = 0
+    for session in sessions:
+        for adapter in set(session.adapters.values()):
+            manager = getattr(adapter, "poolmanager", None)
+            if manager is None:
+                continue
+            for key in list(manager.pools.keys()):
+                pool = manager.pools.get(key)
+                if pool is None:
+                    continue
+                requests_total += pool.num_requests
+                connections += pool.num_connections
+    return _reuse(requests_total, connections)
+
+
+class _ConnectionCounter:
+    """
+    httpx request hook counting requests and the TCP connections opened for
+    them (httpcore reports each new connection through the ``trace`` extension).
+    """
+
+    def __init__(self):
+        self.requests = 0
+        self.connections = 0
+
+    async def on_request(self, request: "httpx.Request") -> None:
+        self.requests += 1
+        request.extensions["trace"] = self._trace
+
+    async def _trace(self, event: str, info: Dict[str, Any]) -> None:
+        if event == "connection.connect_tcp.complete":
+            self.connections += 1
+
+
+_ASYNC_CLIENTS: Dict[PoolConfig, Tuple[asyncio.AbstractEventLoop, "httpx.AsyncClient"]] = {}
+# per config, outliving the clients (a new event loop gets a new client)
+_ASYNC_COUNTERS: Dict[PoolConfig, _ConnectionCounter] = {}
+
+
+def _async_pool_stats(config: Optional[PoolConfig]) -> Dict[str, int]:
+    if config is None:
+        counters = list(_ASYNC_COUNTERS.values())
+    else:
+        counters = [_ASYNC_COUNTERS[config]] if config in _ASYNC_COUNTERS else []
+    return _reuse(
+        sum(c.requests for c in counters), sum(c.connections for c in counters)
+    )
+
+
+def shared_async_client(config: PoolConfig) -> "httpx.AsyncClient":
+    """
+    Return the pooled ``httpx.AsyncClient`` for ``config``, creating it once.
+
+    Connections are bound to the running event loop, so a different loop
+    gets a fresh client; call ``aclose_shared_async_clients()`` from the
+    serving loop on shutdown.
+    """
+    loop = asyncio.get_running_loop()
+    owner, client = _ASYNC_CLIENTS.get(config, (None, None))
+    if client is None or client.is_closed or owner is not loop:
+        limits = httpx.Limits(
+            max_connections=(
+                config.max_per_host * config.host_pools if config.max_per_host else None
+            ),
+            max_keepalive_connections=config.max_keepalive * config.host_pools,
+            keepalive_expiry=config.keepalive_expiry,
+        )
+        counter = _ASYNC_COUNTERS.setdefault(config, _ConnectionCounter())
+        client = httpx.AsyncClient(limits=limits, event_hooks={"request": [counter.on_request]})
+        _ASYNC_CLIENTS[config] = (loop, client)
+    return client
+
+
+async def aclose_shared_async_clients() -> None:
+    """Close every pooled async client. Safe to call twice."""
+    loop = asyncio.get_running_loop()
+    clients = list(_ASYNC_CLIENTS.values())
+    _ASYNC_CLIENTS.clear()
+    for owner, client in clients:
+        if owner is loop:
+            await client.aclose()
+
+
+# ---------------------------
+# Response cache
+# ---------------------------
+
+class CacheEntry(NamedTuple):
+    payload: Dict[str, Any]
+    stored_at: float
+    expires_at: float
+
+
+# key added to a shallow copy of a payload served past its TTL
+STALE_KEY = "_divewise_stale"
+
+
+def _stale_payload(entry: CacheEntry, reason: str) -> Dict[str, Any]:
+    payload = dict(entry.payload)
+    payload[STALE_KEY] = {
+        "age_s": round(time.time() - entry.stored_at, 1),
+        "reason": reason,
+    }
+    return payload
+
+
+class ResponseCache:
+    """
+    Thread-safe LRU + TTL cache for decoded Open-Meteo payloads.
+
+    Keys are endpoint + normalized params. Latitude/longitude are snapped to
+    ``grid`` degrees first (0.01° ≈ 1 km), so near-identical coordinates share
+    an entry; the snapped values are also what gets sent upstream.
+    """
+
+    def __init__(
+            self,
+            max_entries: int = 2048,
+            current_ttl: float = 300.0,
+            forecast_ttl: float = 1800.0,
+            grid: Optional[float] = 0.01,
+            stale_while_revalidate: float = 0.0,
+            stale_if_error: float = 0.0,
+    ):
+        """
+        :param max_entries: Upper bound on cached payloads; least recently used go first.
+        :param current_ttl: Seconds to keep ``current=`` (realtime) payloads.
+        :param forecast_ttl: Seconds to keep ``hourly=``/``daily=`` payloads.
+        :param grid: Coordinate snapping step in degrees; None/0 disables snapping.
+        :param stale_while_revalidate: Seconds past expiry during which an entry is
+                                       still served while a background refresh runs.
+        :param stale_if_error: Seconds past expiry during which an entry is served
+                               when the upstream call fails or times out.
+        """
+        self.max_entries = max_entries
+        self.current_ttl = current_ttl
+        self.forecast_ttl = forecast_ttl
+        self.grid = grid
+        self.stale_while_revalidate = stale_while_revalidate
+        self.stale_if_error = stale_if_error
+        self._entries: "OrderedDict[Hashable, CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.stale_hits = 0
+        self.error_fallbacks = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def snap(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        if not self.grid:
+            return params
+        out = dict(params)
+        for name in ("latitude", "longitude"):
+            value = out.get(name)
+            if isinstance(value, (int, float)):
+                out[name] = round(round(value / self.grid) * self.grid, 6)
+        return out
+
+    @staticmethod
+    def key(url: str, params: Dict[str, Any]) -> Hashable:
+        return url, tuple(sorted((k, str(v)) for k, v in params.items()))
+
+    def ttl_for(self, params: Dict[str, Any]) -> float:
+        return self.current_ttl if "current" in params else self.forecast_ttl
+
+    @property
+    def retention(self) -> float:
+        """Seconds an expired entry is kept around for stale serving."""
+        return max(self.stale_while_revalidate, self.stale_if_error)
+
+    def fallback(self, entry: Optional[CacheEntry]) -> Optional[Dict[str, Any]]:
+        """Stale copy of ``entry`` to serve after an upstream failure, if still allowed."""
+        if entry is None or time.time() - entry.expires_at > self.stale_if_error:
+            return None
+        with self._lock:
+            self.error_fallbacks += 1
+        return _stale_payload(entry, "upstream_error")
+
+    def lookup(self, key: Hashable) -> Optional[CacheEntry]:
+        """Entry for ``key`` if fresh or still inside the stale retention window."""
+        now = time.time()
+        entry = self._memory(key, now)
+        self._count(entry, now)
+        return entry
+
+    async def alookup(self, key: Hashable) -> Optional[CacheEntry]:
+        """``lookup`` for event-loop callers; backends with disk I/O do it off the loop."""
+        return self.lookup(key)
+
+    async def alookup_many(self, keys: List[Hashable]) -> List[Optional[CacheEntry]]:
+        return [self.lookup(key) for key in keys]
+
+    def _memory(self, key: Hashable, now: float) -> Optional[CacheEntry]:
+        """In-memory entry for ``key``, dropped once past retention (not counted)."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry.expires_at + self.retention <= now:
+                del self._entries[key]
+                self.expirations += 1
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def _count(self, entry: Optional[CacheEntry], now: float) -> None:
+        """
+        Tally a lookup the way the clients act on it: an entry past the
+        stale-while-revalidate window is only kept for stale-if-error, so it
+        still means going upstream (a miss).
+        """
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+            elif entry.expires_at > now:
+                self.hits += 1
+            elif now - entry.expires_at <= self.stale_while_revalidate:
+                self.stale_hits += 1
+            else:
+                self.misses += 1
+
+    def set(self, key: Hashable, payload: Dict[str, Any], ttl: float) -> None:
+        now = time.time()
+        self._put(key, CacheEntry(payload, now, now + ttl))
+
+    def _put(self, key: Hashable, entry: CacheEntry) -> None:
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def close(self) -> None:
+        """Release resources held by the cache (in-memory entries are dropped)."""
+        self.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "stale_hits": self.stale_hits,
+                "error_fallbacks": self.error_fallbacks,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+
+class SQLiteResponseCache(ResponseCache):
+    """
+    ResponseCache backed by a local SQLite file shared by every worker on a host.
+
+    The in-memory LRU stays in front as a first level; misses and expired
+    entries fall through to the file (WAL mode, so readers never block the
+    writer), where another worker may already have stored a fresh copy. Every upstream
+    payload is written through to it by a writer thread, so ``set`` never
+    waits on encoding or on another worker's lock; ``alookup`` reads the file
+    on a worker thread. Expiry is stored as wall-clock time so all processes
+    agree on it, and a daemon thread prunes expired rows.
+    """
+
+    def __init__(
+            self,
+            path: str,
+            compress: bool = True,
+            prune_interval: float = 300.0,
+            **kwargs: Any,
+    ):
+        """
+        :param path: SQLite database file (created if missing).
+        :param compress: zlib-compress payloads on disk (worth it for hourly arrays).
+        :param prune_interval: Seconds between background deletes of expired rows.
+        :param kwargs: Passed to ResponseCache (max_entries, TTLs, grid).
+        """
+        super().__init__(**kwargs)
+        self.path = path
+        self.compress = compress
+        self.disk_hits = 0
+        self.disk_writes = 0
+        self.disk_errors = 0
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+
+        conn = self._connection()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY,"
+            " payload BLOB NOT NULL,"
+            " compressed INTEGER NOT NULL,"
+            " stored_at REAL NOT NULL,"
+            " expires_at REAL NOT NULL)"
+        )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS responses_expires_at ON responses (expires_at)"
+        )
+
+        self._writes: "queue.Queue[Optional[Tuple[Hashable, CacheEntry]]]" = queue.Queue()
+        self._writer = threading.Thread(
+            target=self._write_loop, name="divewise-cache-writer", daemon=True
+        )
+        self._writer.start()
+
+        self._stop = threading.Event()
+        self._pruner = threading.Thread(
+            target=self._prune_loop,
+            args=(prune_interval,),
+            name="divewise-cache-prune",
+            daemon=True,
+        )
+        self._pruner.start()
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(
+                self.path, timeout=5.0, isolation_level=None, check_same_thread=False
+            )
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+
+    @staticmethod
+    def _disk_key(key: Hashable) -> str:
+        return json.dumps(key, separators=(",", ":"))
+
+    def lookup(self, key: Hashable) -> Optional[CacheEntry]:
+        now = time.time()
+        entry = self._memory(key, now)
+        if self._check_disk(entry, now):
+            entry = self._promote(key, self._read(key, now), entry)
+        self._count(entry, now)
+        return entry
+
+    async def alookup(self, key: Hashable) -> Optional[CacheEntry]:
+        now = time.time()
+        entry = self._memory(key, now)
+        if self._check_disk(entry, now):
+            entry = self._promote(key, await asyncio.to_thread(self._read, key, now), entry)
+        self._count(entry, now)
+        return entry
+
+    async def alookup_many(self, keys: List[Hashable]) -> List[Optional[CacheEntry]]:
+        """Lookups for many keys; the ones memory cannot answer share one disk trip."""
+        now = time.time()
+        entries = [self._memory(key, now) for key in keys]
+        missing = [i for i, entry in enumerate(entries) if self._check_disk(entry, now)]
+        if missing:
+            rows = await asyncio.to_thread(lambda: [self._read(keys[i], now) for i in missing])
+            for i, row in zip(missing, rows):
+                entries[i] = self._promote(keys[i], row, entries[i])
+        for entry in entries:
+            self._count(entry, now)
+        return entries
+
+    @staticmethod
+    def _check_disk(entry: Optional[CacheEntry], now: float) -> bool:
+        """
+        Whether the file may know better than memory: on a miss, and once the
+        in-memory copy has expired, since another worker may have refreshed it.
+        """
+        return entry is None or entry.expires_at <= now
+
+    def _read(self, key: Hashable, now: float) -> Optional[CacheEntry]:
+        """Row for ``key`` from the file if still inside retention (blocking)."""
+        try:
+            row = self._connection().execute(
+                "SELECT payload, compressed, stored_at, expires_at FROM responses"
+                " WHERE key = ? AND expires_at > ?",
+                (self._disk_key(key), now - self.retention),
+            ).fetchone()
+        except sqlite3.Error:
+            with self._lock:
+                self.disk_errors += 1
+            return None
+        if row is None:
+            return None
+        blob, compressed, stored_at, expires_at = row
+        try:
+            payload = _loads(zlib.decompress(blob) if compressed else blob)
+        except (zlib.error, ValueError):  # corrupt row: a miss, the refetch replaces it
+            with self._lock:
+                self.disk_errors += 1
+            return None
+        return CacheEntry(payload, stored_at, expires_at)
+
+    def _promote(
+            self, key: Hashable, row: Optional[CacheEntry], entry: Optional[CacheEntry] = None
+    ) -> Optional[CacheEntry]:
+        """The newer of ``entry`` (memory) and ``row`` (disk); a newer row is kept in memory."""
+        if row is None or (entry is not None and row.expires_at <= entry.expires_at):
+            return entry
+        self._put(key, row)
+        with self._lock:
+            self.disk_hits += 1
+        return row
+
+    def set(self, key: Hashable, payload: Dict[str, Any], ttl: float) -> None:
+        """Store in memory now and queue the disk write for the writer thread."""
+        now = time.time()
+        entry = CacheEntry(payload, now, now + ttl)
+        self._put(key, entry)
+        self._writes.put((key, entry))
+
+    def flush(self) -> None:
+        """Block until every queued write has reached the file."""
+        self._writes.join()
+
+    def _write_loop(self) -> None:
+        """Write queued entries, one transaction per backlog, until ``close``."""
+        while True:
+            batch = [self._writes.get()]
+            while True:
+                try:
+                    batch.append(self._writes.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self._write([item for item in batch if item is not None])
+            finally:
+                for _ in batch:
+                    self._writes.task_done()
+            if None in batch:
+                return
+
+    def _write(self, items: List[Tuple[Hashable, CacheEntry]]) -> None:
+        if not items:
+            return
+        rows = []
+        for key, entry in items:
+            blob = json.dumps(entry.payload, separators=(",", ":")).encode("utf-8")
+            if self.compress:
+                blob = zlib.compress(blob, 1)
+            rows.append((
+                self._disk_key(key), blob, int(self.compress), entry.stored_at, entry.expires_at
+            ))
+        conn = self._connection()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.executemany(
+                "INSERT OR REPLACE INTO responses"
+                " (key, payload, compressed, stored_at, expires_at)"
+                " VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+            conn.execute("COMMIT")
+        except sqlite3.Error:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            with self._lock:
+                self.disk_errors += 1
+            return
+        with self._lock:
+            self.disk_writes += len(rows)
+
+    def prune(self) -> int:
+        """Delete rows past expiry + retention; returns how many were removed."""
+        cur = self._connection().execute(
+            "DELETE FROM responses WHERE expires_at <= ?", (time.time() - self.retention,)
+        )
+        return cur.rowcount
+
+    def _prune_loop(self, interval: float) -> None:
+        while not self._stop.wait(interval):
+            try:
+                self.prune()
+            except sqlite3.Error:
+                with self._lock:
+                    self.disk_errors += 1
+
+    def clear(self) -> None:
+        """Drop every entry, in memory and on disk (affects all workers)."""
+        super().clear()
+        self.flush()
+        self._connection().execute("DELETE FROM responses")
+
+    def close(self) -> None:
+        """Finish queued writes, stop the threads and close connections (rows stay)."""
+        self._stop.set()
+        if self._writer.is_alive():
+            self._writes.put(None)
+            self._writer.join()
+        ResponseCache.clear(self)
+        with self._connections_lock:
+            connections = list(self._connections)
+            self._connections.clear()
+        for conn in connections:
+            conn.close()
+        self._local = threading.local()
+
+    def stats(self) -> Dict[str, int]:
+        out = super().stats()
+        with self._lock:
+            out.update(
+                disk_hits=self.disk_hits,
+                disk_writes=self.disk_writes,
+                disk_errors=self.disk_errors,
+            )
+        out["disk_pending"] = self._writes.qsize()
+        return out
+
+
+# ---------------------------
+# Request coalescing
+# ---------------------------
+
+class SingleFlight:
+    """
+    Collapse concurrent identical calls (threads) into one.
+
+    The first caller for a key runs ``fn``; callers arriving while it is in
+    flight block on the same future and receive its result or exception.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+        self.leaders = 0
+        self.coalesced = 0
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._calls[key] = future
+                self.leaders += 1
+            else:
+                self.coalesced += 1
+        if not leader:
+            return future.result()
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+    def in_flight(self, key: Hashable) -> bool:
+        return key in self._calls
+
+    def stats(self) -> Dict[str, int]:
+        return {"leaders": self.leaders, "coalesced": self.coalesced}
+
+
+class AsyncSingleFlight:
+    """
+    asyncio counterpart of SingleFlight.
+
+    The shared call runs in its own task, so a cancelled caller (e.g. a
+    disconnected client) does not cancel the fetch for everyone else.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, "asyncio.Future[Any]"] = {}
+        self.leaders = 0
+        self.coalesced = 0
+
+    def start(
+            self, key: Hashable, fn: Callable[[], Awaitable[Any]]
+    ) -> "asyncio.Future[Any]":
+        """Begin (or join) the flight for ``key`` without awaiting it."""
+        task = self._calls.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            self.leaders += 1
+            task.add_done_callback(lambda t: self._finish(key, t))
+        return task
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        return await asyncio.shield(self.start(key, fn))
+
+    def _finish(self, key: Hashable, task: "asyncio.Future[Any]") -> None:
+        self._calls.pop(key, None)
+        if not task.cancelled():
+            task.exception()  # mark retrieved even if every caller went away
+
+    def in_flight(self, key: Hashable) -> bool:
+        return key in self._calls
+
+    def stats(self) -> Dict[str, int]:
+        return {"leaders": self.leaders, "coalesced": self.coalesced}
+
+
+_FLIGHTS = SingleFlight()
+_ASYNC_FLIGHTS = AsyncSingleFlight()
+
+
+def coalesce_stats() -> Dict[str, Dict[str, int]]:
+    """Upstream calls that led a flight vs. callers that piggy-backed on one."""
+    return {"sync": _FLIGHTS.stats(), "async": _ASYNC_FLIGHTS.stats()}
+
+
+# ---------------------------
+# Background fetches
+# ---------------------------
+
+FETCH_WORKERS = 32
+HEDGE_WORKERS = 32
+
+_EXECUTORS: Dict[str, ThreadPoolExecutor] = {}
+_EXECUTOR_LOCK = threading.Lock()
+
+
+def _executor(name: str, workers: int) -> ThreadPoolExecutor:
+    with _EXECUTOR_LOCK:
+        executor = _EXECUTORS.get(name)
+        if executor is None:
+            executor = ThreadPoolExecutor(
+                max_workers=workers, thread_name_prefix=f"divewise-{name}"
+            )
+            _EXECUTORS[name] = executor
+        return executor
+
+
+def fetch_executor() -> ThreadPoolExecutor:
+    """Process-wide thread pool for upstream calls that run alongside the caller."""
+    return _executor("fetch", FETCH_WORKERS)
+
+
+def hedge_executor() -> ThreadPoolExecutor:
+    """
+    Separate pool for the single HTTP attempts raced by hedging. Its tasks never
+    submit more work, so callers already on the fetch pool cannot deadlock it.
+    """
+    return _executor("hedge", HEDGE_WORKERS)
+
+
+# ---------------------------
+# Latency tracking & hedging
+# ---------------------------
+
+class LatencyTracker:
+    """
+    Rolling window of successful single-site upstream latencies (seconds) per
+    endpoint. Multi-site chunks are slower by nature and are not recorded, so
+    hedge delays and marine's read cap stay tuned to single-site calls.
+    """
+
+    def __init__(self, window: int = 512, min_samples: int = 20):
+        self.window = window
+        self.min_samples = min_samples
+        self._samples: Dict[str, Deque[float]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, endpoint: str, seconds: float) -> None:
+        with self._lock:
+            samples = self._samples.get(endpoint)
+            if samples is None:
+                samples = self._samples[endpoint] = deque(maxlen=self.window)
+            samples.append(seconds)
+
+    def percentile(self, endpoint: str, q: float) -> Optional[float]:
+        """``q`` in [0, 1]; None until ``min_samples`` latencies were seen."""
+        with self._lock:
+            samples = sorted(self._samples.get(endpoint) or ())
+        if len(samples) < self.min_samples:
+            return None
+        return samples[min(int(q * len(samples)), len(samples) - 1)]
+
+    def stats(self) -> Dict[str, Dict[str, Optional[float]]]:
+        with self._lock:
+            endpoints = list(self._samples)
+        return {
+            endpoint: {
+                "count": len(self._samples[endpoint]),
+                "p50": self.percentile(endpoint, 0.50),
+                "p95": self.percentile(endpoint, 0.95),
+                "p99": self.percentile(endpoint, 0.99),
+            }
+            for endpoint in endpoints
+        }
+
+
+_LATENCY = LatencyTracker()
+
+
+def latency_stats() -> Dict[str, Dict[str, Optional[float]]]:
+    """Rolling p50/p95/p99 upstream latency per endpoint."""
+    return _LATENCY.stats()
+
+
+@dataclass(frozen=True)
+class HedgePolicy:
+    """
+    When to send a duplicate of a slow upstream request.
+
+    If the first attempt has not answered after the delay, a second identical
+    GET is sent and whichever succeeds first wins. Delays are per endpoint, so
+    weather and marine hedge independently. Only single-site GETs are hedged:
+    a multi-site chunk is slower than their delay by nature, and a duplicate
+    would cost another rate-limit token per site.
+    """
+
+    # fixed hedge delay; None → the endpoint's observed ``percentile`` latency
+    delay_s: Optional[float] = None
+    percentile: float = 0.95
+    # delay used until enough latencies have been observed
+    initial_delay_s: float = 1.0
+    min_delay_s: float = 0.05
+    # process-wide cap: hedges may not exceed this fraction of hedging clients' requests
+    max_ratio: float = 0.05
+
+    def delay_for(self, endpoint: str) -> float:
+        if self.delay_s is not None:
+            return self.delay_s
+        observed = _LATENCY.percentile(endpoint, self.percentile)
+        if observed is None:
+            return self.initial_delay_s
+        return max(observed, self.min_delay_s)
+
+
+class _HedgeBudget:
+    """Process-wide hedge accounting (per endpoint) and rate cap."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts: Dict[str, Dict[str, int]] = {}
+        self._requests = 0
+        self._hedges = 0
+
+    def _endpoint(self, endpoint: str) -> Dict[str, int]:
+        counts = self._counts.get(endpoint)
+        if counts is None:
+            counts = self._counts[endpoint] = {"requests": 0, "hedged": 0, "hedge_wins": 0}
+        return counts
+
+    def request(self, endpoint: str) -> None:
+        with self._lock:
+            self._requests += 1
+            self._endpoint(endpoint)["requests"] += 1
+
+    def try_hedge(self, endpoint: str, max_ratio: float) -> bool:
+        with self._lock:
+            if self._hedges >= max_ratio * self._requests:
+                return False
+            self._hedges += 1
+            self._endpoint(endpoint)["hedged"] += 1
+            return True
+
+    def won(self, endpoint: str) -> None:
+        with self._lock:
+            self._endpoint(endpoint)["hedge_wins"] += 1
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {
+                endpoint: dict(
+                    counts,
+                    hedge_rate=counts["hedged"] / max(counts["requests"], 1),
+                )
+                for endpoint, counts in self._counts.items()
+            }
+
+
+_HEDGES = _HedgeBudget()
+
+
+def hedge_stats() -> Dict[str, Dict[str, Any]]:
+    """Per-endpoint requests, hedges sent, hedges that beat the original, hedge rate."""
+    return _HEDGES.stats()
+
+
+# ---------------------------
+# Timeouts & deadlines
+# ---------------------------
+
+class DeadlineExceeded(OpenMeteoError):
+    """Raised when a call's end-to-end budget ran out before an upstream GET."""
+
+
+class UpstreamTimeout(OpenMeteoError):
+    """Raised when Open-Meteo did not answer a GET within its read timeout."""
+
+
+@dataclass(frozen=True)
+class TimeoutPolicy:
+    """
+    End-to-end deadline for one public call, split across its upstream GETs.
+
+    Weather is required, so it may use whatever is left of the deadline.
+    Marine is best-effort: its read timeout is ``headroom`` × its observed
+    ``percentile`` latency, so one slow sea-state call cannot eat the budget.
+    Connect and read timeouts are set separately; no read outlasts the
+    client's ``timeout``.
+
+    Multi-site calls queue for far more rate-limit tokens than a single site,
+    so they get their own budget: the *_many methods use ``batch_deadline_s``
+    for the whole call, the streaming iter_*_many methods for each window of
+    ``BATCH_SIZE`` sites (a stream as a whole has no deadline).
+    """
+
+    # whole-call budget; None → the client's ``timeout``
+    deadline_s: Optional[float] = None
+    # budget of a batch call or of each streamed window; None → as a single call
+    batch_deadline_s: Optional[float] = None
+    connect_s: float = 3.05
+    percentile: float = 0.99
+    headroom: float = 2.0
+    min_read_s: float = 0.5
+
+    def read_for(self, endpoint: str, remaining: float, best_effort: bool) -> float:
+        read = remaining
+        if best_effort:
+            observed = _LATENCY.percentile(endpoint, self.percentile)
+            if observed is not None:
+                read = min(remaining, max(observed * self.headroom, self.min_read_s))
+        return read
+
+
+# ---------------------------
+# Retries
+# ---------------------------
+
+RETRYABLE_STATUS = (429, 502, 503, 504)
+
+
+class TransientError(OpenMeteoError):
+    """Upstream failure worth retrying: connect error, 429 or 502/503/504."""
+
+    def __init__(
+            self, message: str, retry_after: Optional[float] = None, status: Optional[int] = None
+    ):
+        super().__init__(message, status)
+        self.retry_after = retry_after
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """
+    Retries for idempotent GETs that failed transiently.
+
+    Backoff is "full jitter" exponential: a uniform draw from
+    [0, min(max_delay_s, base_delay_s * 2**n)], raised to a 429's Retry-After.
+    A retry that could not finish before the call's deadline is not sent.
+    """
+
+    max_attempts: int = 3
+    base_delay_s: float = 0.1
+    max_delay_s: float = 2.0
+    # process-wide budget: each call earns ``budget_ratio`` retries, plus
+    # ``min_retries_per_s`` over time, banked up to ``budget_burst``
+    budget_ratio: float = 0.1
+    min_retries_per_s: float = 0.5
+    budget_burst: float = 10.0
+
+    def backoff(self, attempt: int, error: TransientError) -> float:
+        ceiling = min(self.max_delay_s, self.base_delay_s * 2 ** (attempt - 1))
+        return max(random.uniform(0.0, ceiling), error.retry_after or 0.0)
+
+
+class _RetryBudget:
+    """Process-wide retry accounting (per endpoint) and a token-bucket retry cap."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts: Dict[str, Dict[str, Any]] = {}
+        self._balance: Optional[float] = None  # starts full on the first call
+        self._refilled = time.monotonic()
+
+    def _endpoint(self, endpoint: str) -> Dict[str, Any]:
+        counts = self._counts.get(endpoint)
+        if counts is None:
+            counts = self._counts[endpoint] = {
+                "calls": 0, "attempts": 0, "budget_exhausted": 0, "by_attempts": {},
+            }
+        return counts
+
+    def call(self, endpoint: str, policy: RetryPolicy) -> None:
+        now = time.monotonic()
+        with self._lock:
+            if self._balance is None:
+                self._balance = policy.budget_burst
+            earned = policy.budget_ratio + (now - self._refilled) * policy.min_retries_per_s
+            self._balance = min(self._balance + earned, policy.budget_burst)
+            self._refilled = now
+
+    def try_retry(self, endpoint: str) -> bool:
+        with self._lock:
+            if (self._balance or 0.0) < 1.0:
+                self._endpoint(endpoint)["budget_exhausted"] += 1
+                return False
+            self._balance -= 1.0
+            return True
+
+    def done(self, endpoint: str, attempts: int) -> None:
+        with self._lock:
+            counts = self._endpoint(endpoint)
+            counts["calls"] += 1
+            counts["attempts"] += attempts
+            counts["by_attempts"][attempts] = counts["by_attempts"].get(attempts, 0) + 1
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {
+                endpoint: dict(
+                    counts,
+                    # str keys: the stats are served as JSON
+                    by_attempts={str(n): c for n, c in counts["by_attempts"].items()},
+                    attempts_per_call=counts["attempts"] / max(counts["calls"], 1),
+                )
+                for endpoint, counts in self._counts.items()
+            }
+
+
+_RETRIES = _RetryBudget()
+
+
+def retry_stats() -> Dict[str, Dict[str, Any]]:
+    """Per-endpoint calls, attempts, attempts-per-call histogram and budget refusals."""
+    return _RETRIES.stats()
+
+
+# ---------------------------
+# Circuit breaking
+# ---------------------------
+
+class CircuitOpenError(OpenMeteoError):
+    """Raised instead of calling an endpoint whose circuit breaker is open."""
+
+
+@dataclass(frozen=True)
+class BreakerConfig:
+    """Trip thresholds for the per-endpoint circuit breakers."""
+
+    # rolling window the rates below are computed over
+    window_s: float = 30.0
+    # calls needed in the window before the breaker may trip
+    min_calls: int = 10
+    # trip when this fraction of calls failed ...
+    failure_rate: float = 0.5
+    # ... or when this fraction took longer than slow_call_s
+    slow_call_s: float = 5.0
+    slow_rate: float = 0.8
+    # how long to stay open before letting probe calls through
+    cooldown_s: float = 30.0
+    half_open_probes: int = 1
+
+
+class CircuitBreaker:
+    """
+    closed → open → half-open breaker for one upstream endpoint.
+
+    Closed: calls flow and outcomes are tallied over ``window_s``. Open: calls
+    are refused until ``cooldown_s`` has passed. Half-open: up to
+    ``half_open_probes`` calls go through; a good probe closes the breaker,
+    a failed or slow one re-opens it.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, config: BreakerConfig):
+        self.config = config
+        self.state = self.CLOSED
+        self._calls: Deque[Tuple[float, bool, bool]] = deque(maxlen=4096)
+        self._opened_at = 0.0
+        self._probes = 0
+        self._lock = threading.Lock()
+        self.trips = 0
+        self.rejected = 0
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == self.OPEN:
+                if time.monotonic() - self._opened_at < self.config.cooldown_s:
+                    self.rejected += 1
+                    return False
+                self.state = self.HALF_OPEN
+                self._probes = 0
+            if self.state == self.HALF_OPEN:
+                if self._probes >= self.config.half_open_probes:
+                    self.rejected += 1
+                    return False
+                self._probes += 1
+            return True
+
+    def record(self, ok: bool, seconds: float) -> None:
+        slow = seconds >= self.config.slow_call_s
+        now = time.monotonic()
+        with self._lock:
+            if self.state == self.HALF_OPEN:
+                if ok and not slow:
+                    self.state = self.CLOSED
+                    self._calls.clear()
+                else:
+                    self._trip(now)
+                return
+            if self.state == self.OPEN:
+                return
+            self._calls.append((now, ok, slow))
+            while self._calls and now - self._calls[0][0] > self.config.window_s:
+                self._calls.popleft()
+            total = len(self._calls)
+            if total < self.config.min_calls:
+                return
+            failures = sum(1 for _, good, _ in self._calls if not good)
+            slow_calls = sum(1 for _, _, was_slow in self._calls if was_slow)
+            if (
+                failures / total >= self.config.failure_rate
+                or slow_calls / total >= self.config.slow_rate
+            ):
+                self._trip(now)
+
+    def release(self) -> None:
+        """Give back a half-open probe slot for a call that never completed."""
+        with self._lock:
+            if self.state == self.HALF_OPEN and self._probes > 0:
+                self._probes -= 1
+
+    def _trip(self, now: float) -> None:
+        self.state = self.OPEN
+        self._opened_at = now
+        self._calls.clear()
+        self.trips += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"state": self.state, "trips": self.trips, "rejected": self.rejected}
+
+
+_BREAKERS: Dict[str, CircuitBreaker] = {}
+_BREAKERS_LOCK = threading.Lock()
+
+
+def circuit_breaker(endpoint: str, config: BreakerConfig) -> CircuitBreaker:
+    """Process-wide breaker for ``endpoint`` (first config registered wins)."""
+    with _BREAKERS_LOCK:
+        breaker = _BREAKERS.get(endpoint)
+        if breaker is None:
+            breaker = _BREAKERS[endpoint] = CircuitBreaker(config)
+        return breaker
+
+
+def breaker_stats() -> Dict[str, Dict[str, Any]]:
+    """State, trip count and rejected calls per endpoint breaker."""
+    with _BREAKERS_LOCK:
+        breakers = dict(_BREAKERS)
+    return {endpoint: breaker.stats() for endpoint, breaker in breakers.items()}
+
+
+# ---------------------------
+# Rate limiting
+# ---------------------------
+
+class RateLimited(OpenMeteoError):
+    """Raised when a call would have to queue past its budget for upstream capacity."""
+
+
+class _Throttled(OpenMeteoError):
+    """A throttled GET got a 429: pause the limiter for ``pause`` and queue again."""
+
+    def __init__(self, pause: float):
+        super().__init__(f"HTTP 429, retry after {pause:.1f}s", 429)
+        self.pause = pause
+
+
+@dataclass(frozen=True)
+class RateLimitConfig:
+    """
+    Client-side budget for Open-Meteo calls (all endpoints share it).
+
+    The defaults let a 200-site batch with marine (eight 50-site chunks, 400
+    tokens) go out at once from a full bucket, while single-site calls keep
+    ``interactive_reserve`` tokens to themselves. Larger or back-to-back
+    batches queue at ``rate``.
+    """
+
+    # sustained upstream calls per second; a multi-location call costs one per site
+    rate: float = 8.0
+    burst: float = 440.0
+    # tokens multi-site (batch) chunks must leave in the bucket for single-site calls
+    interactive_reserve: float = 40.0
+    # concurrent upstream GETs per process
+    max_in_flight: int = 16
+    # longest a call may queue for a token or a slot before giving up
+    max_wait_s: float = 30.0
+    # pause applied on a 429 that carries no usable Retry-After
+    retry_after_s: float = 1.0
+    # 429s a single call may queue behind before failing
+    max_requeues: int = 3
+    # SQLite file that makes the token bucket host-wide; None → per process
+    path: Optional[str] = None
+
+
+def _retry_after(value: Optional[str], default: float) -> float:
+    """Seconds from a Retry-After header (delta-seconds or HTTP date)."""
+    if not value:
+        return default
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return default
+
+
+class RateLimiter:
+    """
+    Token bucket plus max-in-flight semaphore.
+
+    ``reserve`` books the next free token and returns how long the caller must
+    wait for it, so concurrent callers queue at ``rate`` instead of bursting and
+    backing off. Bulk (multi-site) calls never book ahead: they take tokens
+    only once the bucket holds them on top of ``interactive_reserve``, so a
+    batch cannot queue single-site calls behind it. ``pause`` empties the
+    bucket until a 429's Retry-After has passed; calls booked meanwhile queue
+    behind it.
+    """
+
+    def __init__(self, config: RateLimitConfig):
+        self.config = config
+        self._tokens = config.burst
+        self._updated = self._clock()
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(config.max_in_flight)
+        self._async_slots: "weakref.WeakKeyDictionary[Any, asyncio.Semaphore]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self.calls = 0
+        self.queued = 0
+        self.waited_s = 0.0
+        self.throttled = 0
+        self.rejected = 0
+
+    @staticmethod
+    def _clock() -> float:
+        return time.monotonic()
+
+    def _take(
+            self, tokens: float, updated: float, now: float, cost: float, bulk: bool = False
+    ) -> Tuple[float, float, float]:
+        """
+        Bucket state after booking ``cost`` tokens, and the wait for them.
+        For ``bulk`` a non-zero wait means nothing was taken: try again then.
+        """
+        if now > updated:
+            tokens = min(self.config.burst, tokens + (now - updated) * self.config.rate)
+            updated = now
+        if bulk:
+            # a chunk larger than burst - reserve waits for a full bucket instead
+            need = min(cost + self.config.interactive_reserve, self.config.burst)
+            if tokens < need:
+                return tokens, updated, (updated - now) + (need - tokens) / self.config.rate
+            return tokens - cost, updated, 0.0
+        tokens -= cost
+        wait_s = (updated - now) + max(-tokens, 0.0) / self.config.rate
+        return tokens, updated, wait_s
+
+    def _book(self, cost: float, limit: float, bulk: bool = False) -> Optional[float]:
+        with self._lock:
+            tokens, updated, wait_s = self._take(
+                self._tokens, self._updated, self._clock(), cost, bulk
+            )
+            if wait_s > limit:
+                return None
+            if not (bulk and wait_s):
+                self._tokens, self._updated = tokens, updated
+            return wait_s
+
+    def _hold(self, seconds: float) -> None:
+        with self._lock:
+            self._tokens = 0.0
+            self._updated = max(self._updated, self._clock() + seconds)
+
+    def reserve(
+            self, cost: float = 1.0, budget: Optional[float] = None, bulk: bool = False
+    ) -> float:
+        """
+        Book ``cost`` tokens; returns the seconds to wait before sending.
+
+        With ``bulk``, 0.0 means the tokens were taken; any other value is how
+        long to sleep before calling ``reserve`` again (nothing was booked).
+
+        :raises RateLimited: if the wait would exceed ``budget`` / ``max_wait_s``.
+        """
+        limit = self.config.max_wait_s if budget is None else min(budget, self.config.max_wait_s)
+        wait_s = self._book(cost, limit, bulk)
+        if wait_s is None:
+            self.rejected += 1
+            raise RateLimited(f"Upstream rate limit: no capacity within {limit:.1f}s")
+        if wait_s > 0:
+            self.queued += 1
+            self.waited_s += wait_s
+        if not (bulk and wait_s):
+            self.calls += 1
+        return wait_s
+
+    async def areserve(
+            self, cost: float = 1.0, budget: Optional[float] = None, bulk: bool = False
+    ) -> float:
+        """``reserve`` for event-loop callers."""
+        return self.reserve(cost, budget, bulk)
+
+    def pause(self, seconds: float) -> None:
+        """Stop handing out tokens for ``seconds`` (after an upstream 429)."""
+        self.throttled += 1
+        self._hold(seconds)
+
+    async def apause(self, seconds: float) -> None:
+        """``pause`` for event-loop callers."""
+        self.pause(seconds)
+
+    def _slot_timeout(self, budget: Optional[float]) -> float:
+        return self.config.max_wait_s if budget is None else min(budget, self.config.max_wait_s)
+
+    @contextmanager
+    def slot(self, budget: Optional[float] = None) -> Iterator[None]:
+        """Hold one of the ``max_in_flight`` slots (threads)."""
+        if not self._slots.acquire(timeout=self._slot_timeout(budget)):
+            self.rejected += 1
+            raise RateLimited("Upstream concurrency limit: no free slot")
+        try:
+            yield
+        finally:
+            self._slots.release()
+
+    @asynccontextmanager
+    async def aslot(self, budget: Optional[float] = None) -> AsyncIterator[None]:
+        """Hold one of the ``max_in_flight`` slots (current event loop)."""
+        loop = asyncio.get_running_loop()
+        slots = self._async_slots.get(loop)
+        if slots is None:
+            slots = self._async_slots[loop] = asyncio.Semaphore(self.config.max_in_flight)
+        try:
+            await asyncio.wait_for(slots.acquire(), self._slot_timeout(budget))
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            raise RateLimited("Upstream concurrency limit: no free slot") from None
+        try:
+            yield
+        finally:
+            slots.release()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "queued": self.queued,
+            "waited_s": round(self.waited_s, 3),
+            "throttled": self.throttled,
+            "rejected": self.rejected,
+        }
+
+
+class SQLiteRateLimiter(RateLimiter):
+    """
+    RateLimiter whose token bucket lives in a SQLite file, so every worker on
+    the host draws from one budget. The in-flight cap stays per process.
+    Bucket updates take the file's write lock, so ``areserve`` / ``apause``
+    run them on a worker thread.
+    """
+
+    def __init__(self, config: RateLimitConfig):
+        super().__init__(config)
+        self._local = threading.local()
+        conn = self._connection()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS rate_limit ("
+            " name TEXT PRIMARY KEY,"
+            " tokens REAL NOT NULL,"
+            " updated REAL NOT NULL)"
+        )
+        conn.execute(
+            "INSERT OR IGNORE INTO rate_limit VALUES ('open-meteo', ?, ?)",
+            (config.burst, self._clock()),
+        )
+
+    @staticmethod
+    def _clock() -> float:
+        return time.time()  # shared across processes, so no monotonic clock
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(
+                self.config.path, timeout=5.0, isolation_level=None, check_same_thread=False
+            )
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def _bucket(self) -> Iterator[Tuple[sqlite3.Connection, float, float]]:
+        conn = self._connection()
+        with self._lock:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                tokens, updated = conn.execute(
+                    "SELECT tokens, updated FROM rate_limit WHERE name = 'open-meteo'"
+                ).fetchone()
+                yield conn, tokens, updated
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+
+    def _store(self, conn: sqlite3.Connection, tokens: float, updated: float) -> None:
+        conn.execute(
+            "UPDATE rate_limit SET tokens = ?, updated = ? WHERE name = 'open-meteo'",
+            (tokens, updated),
+        )
+
+    def _book(self, cost: float, limit: float, bulk: bool = False) -> Optional[float]:
+        with self._bucket() as (conn, tokens, updated):
+            tokens, updated, wait_s = self._take(tokens, updated, self._clock(), cost, bulk)
+            if wait_s > limit:
+                return None
+            if not (bulk and wait_s):
+                self._store(conn, tokens, updated)
+            return wait_s
+
+    def _hold(self, seconds: float) -> None:
+        with self._bucket() as (conn, _, updated):
+            self._store(conn, 0.0, max(updated, self._clock() + seconds))
+
+    async def areserve(
+            self, cost: float = 1.0, budget: Optional[float] = None, bulk: bool = False
+    ) -> float:
+        return await asyncio.to_thread(self.reserve, cost, budget, bulk)
+
+    async def apause(self, seconds: float) -> None:
+        await asyncio.to_thread(self.pause, seconds)
+
+
+_LIMITERS: Dict[RateLimitConfig, RateLimiter] = {}
+_LIMITERS_LOCK = threading.Lock()
+
+
+def rate_limiter(config: RateLimitConfig) -> RateLimiter:
+    """Process-wide limiter for ``config`` (host-wide when ``config.path`` is set)."""
+    with _LIMITERS_LOCK:
+        limiter = _LIMITERS.get(config)
+        if limiter is None:
+            cls = SQLiteRateLimiter if config.path else RateLimiter
+            limiter = _LIMITERS[config] = cls(config)
+        return limiter
+
+
+def rate_limit_stats() -> Dict[str, Dict[str, Any]]:
+    """Calls, queued calls, total queueing time, 429 pauses and rejections."""
+    with _LIMITERS_LOCK:
+        limiters = list(_LIMITERS.values())
+    return {limiter.config.path or "process": limiter.stats() for limiter in limiters}
+
+
+# ---------------------------
+# Hourly series
+# ---------------------------
+
+class ColumnView(Sequence[Any]):
+    """
+    Read-only window of ``length`` positions onto ``values``, starting at
+    ``start`` (which may be negative or run past the end). Positions outside
+    ``values`` read as None, so a series can be aligned onto another's hours
+    by index offset without copying it.
+    """
+
+    __slots__ = ("_values", "_start", "_len")
+
+    def __init__(self, values: List[Any], start: int, length: int):
+        self._values = values
+        self._start = start
+        self._len = max(length, 0)
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            lo, hi, step = index.indices(self._len)
+            if step != 1:
+                return [self[i] for i in range(lo, hi, step)]
+            return ColumnView(self._values, self._start + lo, hi - lo)
+        if index < 0:
+            index += self._len
+        if not 0 <= index < self._len:
+            raise IndexError("column index out of range")
+        i = self._start + index
+        return self._values[i] if 0 <= i < len(self._values) else None
+
+    def __iter__(self) -> Iterator[Any]:
+        lo, n = self._start, len(self._values)
+        a, b = min(max(lo, 0), n), min(max(lo + self._len, 0), n)
+        lead = min(max(-lo, 0), self._len)
+        return chain(repeat(None, lead), self._values[a:b], repeat(None, self._len - lead - (b - a)))
+
+
+class HourlyColumns(Sequence[Dict[str, Any]]):
+    """
+    Hourly series kept the way Open-Meteo sends it: one list per field, all
+    aligned on ``time``. Indexing or iterating yields per-hour row dicts built
+    on demand; code that only needs a few fields should use ``column``.
+    """
+
+    def __init__(self, columns: Dict[str, Sequence[Any]]):
+        self.columns = columns
+        self._len = len(columns.get("time") or ())
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Dict[str, Any]]) -> "HourlyColumns":
+        rows = list(rows)
+        names: Dict[str, None] = {}
+        for row in rows:
+            names.update(dict.fromkeys(row))
+        return cls({name: [row.get(name) for row in rows] for name in names})
+
+    def column(self, name: str) -> Sequence[Any]:
+        """Values of ``name`` per hour (all None if the field is missing)."""
+        values = self.columns.get(name)
+        return values if values is not None else [None] * self._len
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return HourlyColumns({name: values[index] for name, values in self.columns.items()})
+        if index < 0:
+            index += self._len
+        if not 0 <= index < self._len:
+            raise IndexError("hour index out of range")
+        return {name: values[index] for name, values in self.columns.items()}
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        names = list(self.columns)
+        for values in zip(*self.columns.values()):
+            yield dict(zip(names, values))
+
+    def to_rows(self) -> List[Dict[str, Any]]:
+        return list(self)
+
+    def to_dict(self) -> Dict[str, List[Any]]:
+        return {name: list(values) for name, values in self.columns.items()}
+
+
+# ---------------------------
+# Multi-location batches
+# ---------------------------
+
+Coord = Tuple[float, float]
+
+
+class _BatchPlan:
+    """
+    Per-site params for one endpoint, split into cache hits and upstream chunks.
+
+    Open-Meteo accepts comma-separated ``latitude``/``longitude`` lists and
+    answers with one payload per coordinate, in order. ``split`` takes the
+    cache lookups (``lookup`` / ``alookup``) and turns the sites missing from
+    the cache into chunks, each one such request; ``resolve`` splits the
+    answer back into per-site payloads (and caches them under the same keys a
+    single-site call would use).
+    """
+
+    def __init__(
+            self,
+            url: str,
+            site_params: List[Dict[str, Any]],
+            cache: Optional[ResponseCache],
+            batch_size: int,
+    ):
+        self.url = url
+        self.cache = cache
+        self.batch_size = batch_size
+        if cache is not None:
+            site_params = [cache.snap(p) for p in site_params]
+        self.site_params = site_params
+        self.keys = [ResponseCache.key(url, p) for p in site_params]
+        self.results: List[Union[Dict[str, Any], OpenMeteoError, None]] = (
+            [None] * len(site_params)
+        )
+        # expired entries kept for a stale-if-error fallback should a chunk fail
+        self.stale: Dict[int, CacheEntry] = {}
+        self.chunks: List[Tuple[List[int], Dict[str, Any]]] = []
+
+    def lookup(self) -> List[Optional[CacheEntry]]:
+        if self.cache is None:
+            return [None] * len(self.keys)
+        return [self.cache.lookup(key) for key in self.keys]
+
+    async def alookup(self) -> List[Optional[CacheEntry]]:
+        if self.cache is None:
+            return [None] * len(self.keys)
+        return await self.cache.alookup_many(self.keys)
+
+    def split(self, entries: List[Optional[CacheEntry]]) -> None:
+        """Serve fresh cache ``entries`` (one per site) and chunk the remaining sites."""
+        misses: List[int] = []
+        now = time.time()
+        for i, entry in enumerate(entries):
+            if entry is not None and entry.expires_at > now:
+                self.results[i] = entry.payload
+                continue
+            if entry is not None:
+                self.stale[i] = entry
+            misses.append(i)
+
+        site_params = self.site_params
+        for start in range(0, len(misses), self.batch_size):
+            idxs = misses[start:start + self.batch_size]
+            params = dict(site_params[idxs[0]])
+            params["latitude"] = ",".join(str(site_params[i]["latitude"]) for i in idxs)
+            params["longitude"] = ",".join(str(site_params[i]["longitude"]) for i in idxs)
+            self.chunks.append((idxs, params))
+
+    def resolve(self, idxs: List[int], payload: Any) -> None:
+        items = payload if isinstance(payload, list) else [payload]
+        if len(items) != len(idxs):
+            self.fail(idxs, OpenMeteoError(
+                f"Expected {len(idxs)} locations in batch response, got {len(items)}"
+            ))
+            return
+        for i, item in zip(idxs, items):
+            self.results[i] = item
+            if self.cache is not None:
+                self.cache.set(
+                    self.keys[i], item, self.cache.ttl_for(self.site_params[i])
+                )
+
+    def fail(self, idxs: List[int], error: OpenMeteoError) -> None:
+        for i in idxs:
+            fallback = self.cache.fallback(self.stale.get(i)) if self.cache else None
+            self.results[i] = error if fallback is None else fallback
+
+
+class _DiveWiseBase:
+    """
+    Request building, upstream call policy and payload parsing shared by the
+    sync and async clients.
     """
 
     WEATHER_BASE = "https://api.open-meteo.com/v1/forecast"
     MARINE_BASE = "https://marine-api.open-meteo.com/v1/marine"
 
+    # locations per upstream request in the *_many methods
+    BATCH_SIZE = 50
+    # batches in flight at once in the streaming iter_*_many methods
+    STREAM_WINDOWS = 4
+    # longest span get_forecast_range accepts (Open-Meteo forecasts 16 days)
+    MAX_RANGE_DAYS = 16
+    # marine hourly fields joined onto forecast hours (Open-Meteo name → output name)
+    MARINE_HOURLY = {
+        "wave_height": "wave_height_m",
+        "wave_period": "wave_period_s",
+        "swell_wave_height": "swell_wave_height_m",
+        "wind_wave_height": "wind_wave_height_m",
+    }
+
     # WMO code → simple text label (subset most useful for divers)
     WMO_CODE = {
         0: "Clear",
@@ -55,23 +1745,69 @@ class DiveWiseWeather:
         99: "Thunderstorm with heavy hail",
     }
 
-    def __init__(self, timeout: int = 15, include_marine: bool = True):
+    def __init__(
+            self,
+            timeout: int = 15,
+            include_marine: bool = True,
+            pool: Optional[PoolConfig] = None,
+            cache: Optional[ResponseCache] = None,
+            coalesce: bool = True,
+            hedge: Optional[HedgePolicy] = None,
+            breaker: Optional[BreakerConfig] = None,
+            timeouts: Optional[TimeoutPolicy] = None,
+            rate_limit: Optional[RateLimitConfig] = None,
+            retry: Optional[RetryPolicy] = None,
+            json_decoder: Optional[JSONDecoder] = None,
+    ):
         """
-        :param timeout: HTTP timeout in seconds.
+        :param timeout: HTTP timeout in seconds; with ``timeouts`` set, also the
+                        upper bound of each single-site call's end-to-end deadline.
         :param include_marine: If True, also fetch marine (wave) data when available.
+        :param pool: Connection pool settings; clients with equal settings share
+                     one keep-alive pool. Defaults to ``PoolConfig()``.
+        :param cache: Optional response cache; pass the same instance to several
+                      clients to share entries between them.
+        :param coalesce: If True, identical in-flight upstream calls (process-wide)
+                         share a single request.
+        :param hedge: Optional hedging policy for slow upstream responses.
+        :param breaker: Optional circuit-breaker thresholds, applied per endpoint.
+                        Only transient errors, timeouts and 5xx count as failures.
+                        While the marine breaker is open, sea state comes from
+                        the cache (stale if need be) or is skipped.
+        :param timeouts: Optional deadline policy; splits one budget per public
+                         call across the weather and marine requests.
+        :param rate_limit: Optional client-side rate limit and in-flight cap;
+                           429s then wait out Retry-After and queue again.
+        :param retry: Optional retry policy for transient upstream failures.
+        :param json_decoder: Decoder for raw response bodies; defaults to orjson
+                             when installed, else the stdlib.
         """
         self.timeout = timeout
         self.include_marine = include_marine
+        self.pool = pool or PoolConfig()
+        self.cache = cache
+        self.coalesce = coalesce
+        self.hedge = hedge
+        self.breaker = breaker
+        self.timeouts = timeouts
+        self.rate_limit = rate_limit
+        self.retry = retry
+        self.json_decoder = json_decoder or default_json_decoder()
 
     # ---------------------------
-    # Public API
+    # Request parameters
     # ---------------------------
 
-    def get_realtime(self, lat: float, lon: float) -> Dict[str, Any]:
-        """
-        Get real-time conditions for a coordinate.
-        """
-        weather_params = {
+    @staticmethod
+    def _parse_date(date_str: str) -> date:
+        try:
+            return datetime.strptime(date_str, "%Y-%m-%d").date()
+        except ValueError as e:
+            raise ValueError("date must be in 'YYYY-MM-DD' format") from e
+
+    @staticmethod
+    def _realtime_weather_params(lat: float, lon: float) -> Dict[str, Any]:
+        return {
             "latitude": lat,
             "longitude": lon,
             "current": ",".join(
@@ -90,139 +1826,498 @@ class DiveWiseWeather:
             ),
             "timezone": "auto",
         }
-        weather = self._get_json(self.WEATHER_BASE, weather_params)
 
-        result: Dict[str, Any] = {
-            "coord": {"lat": lat, "lon": lon},
-            "weather": self._parse_current_weather(weather),
+    @staticmethod
+    def _realtime_marine_params(lat: float, lon: float) -> Dict[str, Any]:
+        return {
+            "latitude": lat,
+            "longitude": lon,
+            "current": ",".join(
+                [
+                    "wave_height",
+                    "wave_direction",
+                    "wave_period",
+                    "wind_wave_height",
+                    "wind_wave_direction",
+                    "wind_wave_period",
+                    "swell_wave_height",
+                    "swell_wave_direction",
+                    "swell_wave_period",
+                ]
+            ),
+            "timezone": "auto",
         }
 
-        if self.include_marine:
-            marine_params = {
-                "latitude": lat,
-                "longitude": lon,
-                "current": ",".join(
-                    [
-                        "wave_height",
-                        "wave_direction",
-                        "wave_period",
-                        "wind_wave_height",
-                        "wind_wave_direction",
-                        "wind_wave_period",
-                        "swell_wave_height",
-                        "swell_wave_direction",
-                        "swell_wave_period",
-                    ]
-                ),
-                "timezone": "auto",
-            }
-            marine = self._get_json(self.MARINE_BASE, marine_params, allow_fail=True)
-            if marine:
-                result["marine"] = self._parse_current_marine(marine)
+    def _parse_range(self, start_str: str, end_str: str) -> Tuple[date, date]:
+        start, end = self._parse_date(start_str), self._parse_date(end_str)
+        if end < start:
+            raise ValueError("end date must not be before start date")
+        if (end - start).days >= self.MAX_RANGE_DAYS:
+            raise ValueError(f"date range is limited to {self.MAX_RANGE_DAYS} days")
+        return start, end
 
-        return result
+    @staticmethod
+    def _forecast_weather_params(
+            lat: float, lon: float, target: date, end: Optional[date] = None
+    ) -> Dict[str, Any]:
+        return {
+            "latitude": lat,
+            "longitude": lon,
+            "start_date": target.isoformat(),
+            "end_date": (end or target).isoformat(),
+            "daily": ",".join(
+                [
+                    "temperature_2m_max",
+                    "temperature_2m_min",
+                    "precipitation_sum",
+                    "rain_sum",
+                    "windspeed_10m_max",
+                    "windgusts_10m_max",
+                    "winddirection_10m_dominant",
+                    "uv_index_max",
+                    "shortwave_radiation_sum",
+                    "sunrise",
+                    "sunset",
+                ]
+            ),
+            "hourly": ",".join(
+                [
+                    "temperature_2m",
+                    "apparent_temperature",
+                    "precipitation",
+                    "rain",
+                    "cloud_cover",
+                    "wind_speed_10m",
+                    "wind_gusts_10m",
+                    "wind_direction_10m",
+                    "weather_code",
+                ]
+            ),
+            "timezone": "auto",
+        }
 
-    def get_forecast_for_date(
-            self, lat: float, lon: float, date_str: str
+    @staticmethod
+    def _forecast_marine_params(
+            lat: float, lon: float, target: date, end: Optional[date] = None
     ) -> Dict[str, Any]:
+        return {
+            "latitude": lat,
+            "longitude": lon,
+            "start_date": target.isoformat(),
+            "end_date": (end or target).isoformat(),
+            "hourly": ",".join(
+                [
+                    "wave_height",
+                    "wave_direction",
+                    "wave_period",
+                    "wind_wave_height",
+                    "swell_wave_height",
+                ]
+            ),
+            "timezone": "auto",
+        }
+
+    # ---------------------------
+    # Payload parsing
+    # ---------------------------
+
+    def _deadline(self, batch: bool = False) -> Optional[float]:
+        """
+        Monotonic deadline for a public call, or for a ``batch`` of sites
+        (None without a timeout policy).
         """
-        Get a daily summary + hourly series for a specific date (local time).
+        if self.timeouts is None:
+            return None
+        if batch and self.timeouts.batch_deadline_s is not None:
+            return time.monotonic() + self.timeouts.batch_deadline_s
+        budget = self.timeout
+        if self.timeouts.deadline_s is not None:
+            budget = min(budget, self.timeouts.deadline_s)
+        return time.monotonic() + budget
+
+    def _remaining(self, deadline: Optional[float]) -> float:
+        return self.timeout if deadline is None else deadline - time.monotonic()
+
+    def _timeouts_for(
+            self, url: str, params: Dict[str, Any], deadline: Optional[float]
+    ) -> Tuple[float, float]:
+        """(connect, read) seconds for one upstream GET to ``url``."""
+        if self.timeouts is None:
+            return self.timeout, self.timeout
+        remaining = self._remaining(deadline)
+        if remaining <= 0:
+            raise DeadlineExceeded(f"Deadline exceeded before calling {url}")
+        # a multi-site chunk answers for many sites and is slower than the
+        # single-site latencies marine's read cap comes from: no cap for it
+        best_effort = url == self.MARINE_BASE and self._call_cost(params) == 1
+        read = min(self.timeouts.read_for(url, remaining, best_effort), self.timeout)
+        return min(self.timeouts.connect_s, read), read
+
+    def _limiter(self) -> Optional[RateLimiter]:
+        return rate_limiter(self.rate_limit) if self.rate_limit is not None else None
+
+    @staticmethod
+    def _call_cost(params: Dict[str, Any]) -> float:
+        """Upstream calls a GET counts as: one per site in a multi-location request."""
+        return float(str(params.get("latitude", "")).count(",") + 1)
+
+    @staticmethod
+    def _queue_until(limiter: RateLimiter, deadline: Optional[float]) -> float:
+        """Monotonic time a call may queue for rate-limit tokens until."""
+        if deadline is None:
+            return time.monotonic() + limiter.config.max_wait_s
+        return deadline
+
+    def _breaker_for(self, url: str) -> Optional[CircuitBreaker]:
+        return circuit_breaker(url, self.breaker) if self.breaker is not None else None
+
+    @staticmethod
+    def _skip_reason(error: BaseException) -> Optional[str]:
+        """``marine_skipped`` value for a marine fetch that failed with ``error``."""
+        if isinstance(error, CircuitOpenError):
+            return "circuit_open"
+        if isinstance(error, RateLimited):
+            return "rate_limited"
+        return None
+
+    # ---------------------------
+    # Upstream call policy
+    # ---------------------------
+    # Cache, breaker, retry, hedge and rate-limit decisions for one upstream
+    # GET. The clients only supply the I/O: sending, sleeping and waiting.
+
+    def _keyed(self, url: str, params: Dict[str, Any]) -> Tuple[Dict[str, Any], Hashable]:
+        """``params`` as cached (snapped coordinates) and their cache key."""
+        if self.cache is not None:
+            params = self.cache.snap(params)
+        return params, ResponseCache.key(url, params)
+
+    def _from_cache(
+            self,
+            url: str,
+            params: Dict[str, Any],
+            key: Hashable,
+            entry: Optional[CacheEntry],
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Payload to answer with from ``entry`` without waiting on upstream: a
+        fresh one, or an expired one still inside the stale-while-revalidate
+        window (the client's ``_revalidate`` starts a background refresh).
+        None → fetch it.
+        """
+        if entry is None:
+            return None
+        now = time.time()
+        if entry.expires_at > now:
+            return entry.payload
+        if now - entry.expires_at > self.cache.stale_while_revalidate:
+            return None
+        self._revalidate(url, params, key)
+        return _stale_payload(entry, "revalidating")
+
+    def _fallback(self, entry: Optional[CacheEntry]) -> Optional[Dict[str, Any]]:
+        """Stale-if-error payload for a failed fetch, if ``entry`` may still serve."""
+        return self.cache.fallback(entry) if self.cache is not None else None
+
+    def _store(self, key: Hashable, params: Dict[str, Any], data: Dict[str, Any]) -> None:
+        if self.cache is not None:
+            self.cache.set(key, data, self.cache.ttl_for(params))
+
+    @contextmanager
+    def _guarded(self, url: str) -> Iterator[None]:
+        """
+        Circuit-breaker accounting around one upstream GET to ``url`` (usable
+        around an ``await`` too). It is entered once the GET holds its
+        rate-limit token and slot, so queueing is neither timed as upstream
+        slowness nor holds a half-open probe slot.
+
+        :raises CircuitOpenError: while ``url``'s breaker is open.
+        """
+        breaker = self._breaker_for(url)
+        if breaker is None:
+            yield
+            return
+        if not breaker.allow():
+            raise CircuitOpenError(f"Circuit open for {url}")
+        started = time.monotonic()
+        try:
+            yield
+        except OpenMeteoError as e:
+            if self._unhealthy(e):
+                breaker.record(False, time.monotonic() - started)
+            else:
+                breaker.release()  # says nothing about the endpoint's health
+            raise
+        except BaseException:
+            breaker.release()  # never completed (e.g. cancelled)
+            raise
+        breaker.record(True, time.monotonic() - started)
+
+    @staticmethod
+    def _unhealthy(error: OpenMeteoError) -> bool:
+        """
+        Whether ``error`` counts as a failure against the endpoint's breaker:
+        transient errors, timeouts and 5xx do. A 4xx (bad input, upstream 429)
+        does not.
+        """
+        if error.status is not None:
+            return error.status >= 500
+        return isinstance(error, (TransientError, UpstreamTimeout))
+
+    def _start_attempts(self, url: str) -> None:
+        if self.retry is not None:
+            _RETRIES.call(url, self.retry)
+
+    def _retry_delay(
+            self, url: str, attempt: int, error: OpenMeteoError, deadline: Optional[float]
+    ) -> Optional[float]:
+        """
+        Backoff before the next attempt after ``error``, or None when no retry
+        should be sent (the call's attempts are then recorded).
+        """
+        delay = None
+        if isinstance(error, TransientError) and self.retry is not None:
+            if attempt < self.retry.max_attempts:
+                delay = self.retry.backoff(attempt, error)
+                if delay >= self._remaining(deadline) or not _RETRIES.try_retry(url):
+                    delay = None
+        if delay is None:
+            self._record_attempts(url, attempt)
+        return delay
+
+    def _record_attempts(self, url: str, attempts: int) -> None:
+        if self.retry is not None:
+            _RETRIES.done(url, attempts)
+
+    def _hedges(self, params: Dict[str, Any]) -> bool:
+        """Whether a GET with ``params`` is sent through hedging."""
+        return self.hedge is not None and self._call_cost(params) == 1
+
+    def _slot_budget(self, deadline: Optional[float]) -> Optional[float]:
+        """Longest a GET may wait for an in-flight slot."""
+        return None if deadline is None else self._remaining(deadline)
+
+    @staticmethod
+    def _requeues_exhausted(url: str, limiter: RateLimiter) -> RateLimited:
+        return RateLimited(f"HTTP 429 from {url} after {limiter.config.max_requeues} retries")
+
+    def _throttle(self, status: int, headers: Any, throttle: bool) -> None:
+        """
+        :raises _Throttled: when a ``throttle``-d GET got a 429, with the
+            Retry-After to pause the rate limiter for before queueing again.
+        """
+        if status == 429 and throttle:
+            raise _Throttled(
+                _retry_after(headers.get("Retry-After"), self.rate_limit.retry_after_s)
+            )
+
+    def _payload(
+            self,
+            url: str,
+            params: Dict[str, Any],
+            status: int,
+            headers: Any,
+            body: bytes,
+            started: float,
+    ) -> Dict[str, Any]:
+        """
+        Decoded payload of a GET that got ``status``; records its latency if
+        it was for a single site.
+
+        :raises TransientError: for 429 / 502 / 503 / 504.
+        :raises OpenMeteoError: for any other non-200 status or a bad body.
         """
+        if status != 200:
+            message = f"HTTP {status}: {body[:200].decode('utf-8', 'replace')}"
+            if status in RETRYABLE_STATUS:
+                raise TransientError(
+                    message, _retry_after(headers.get("Retry-After"), 0.0), status
+                )
+            raise OpenMeteoError(message, status)
         try:
-            target = datetime.strptime(date_str, "%Y-%m-%d").date()
+            data = self.json_decoder(body)
         except ValueError as e:
-            raise ValueError("date must be in 'YYYY-MM-DD' format") from e
+            raise OpenMeteoError(str(e)) from e
+        if self._call_cost(params) == 1:
+            _LATENCY.record(url, time.monotonic() - started)
+        return self._check_payload(data)
 
-        weather_params = {
-            "latitude": lat,
-            "longitude": lon,
-            "start_date": target.isoformat(),
-            "end_date": target.isoformat(),
-            "daily": ",".join(
-                [
-                    "temperature_2m_max",
-                    "temperature_2m_min",
-                    "precipitation_sum",
-                    "rain_sum",
-                    "windspeed_10m_max",
-                    "windgusts_10m_max",
-                    "winddirection_10m_dominant",
-                    "uv_index_max",
-                    "shortwave_radiation_sum",
-                    "sunrise",
-                    "sunset",
-                ]
-            ),
-            "hourly": ",".join(
-                [
-                    "temperature_2m",
-                    "apparent_temperature",
-                    "precipitation",
-                    "rain",
-                    "cloud_cover",
-                    "wind_speed_10m",
-                    "wind_gusts_10m",
-                    "wind_direction_10m",
-                    "weather_code",
-                ]
-            ),
-            "timezone": "auto",
+    def _build_realtime(
+            self,
+            lat: float,
+            lon: float,
+            weather: Dict[str, Any],
+            marine: Optional[Dict[str, Any]],
+            marine_skipped: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        result: Dict[str, Any] = {
+            "coord": {"lat": lat, "lon": lon},
+            "weather": self._parse_current_weather(weather),
         }
-        weather = self._get_json(self.WEATHER_BASE, weather_params)
+        if marine:
+            result["marine"] = self._parse_current_marine(marine)
+        if marine_skipped:
+            result["marine_skipped"] = marine_skipped
+        self._attach_staleness(result, weather, marine)
+        return result
 
+    def _build_forecast(
+            self,
+            lat: float,
+            lon: float,
+            target: date,
+            weather: Dict[str, Any],
+            marine: Optional[Dict[str, Any]],
+            marine_skipped: Optional[str] = None,
+    ) -> Dict[str, Any]:
         out: Dict[str, Any] = {
             "coord": {"lat": lat, "lon": lon},
             "date": target.isoformat(),
             "daily": self._parse_daily_weather(weather),
-            "hourly": self._select_hourly_for_date(weather, target),
+            "hourly": self._select_hourly_for_date(weather, target, marine),
         }
+        if marine:
+            out["marine_daily"] = self._aggregate_marine_day(marine)
+        if marine_skipped:
+            out["marine_skipped"] = marine_skipped
+        self._attach_staleness(out, weather, marine)
+        return out
 
-        if self.include_marine:
-            marine_params = {
-                "latitude": lat,
-                "longitude": lon,
-                "start_date": target.isoformat(),
-                "end_date": target.isoformat(),
-                "hourly": ",".join(
-                    [
-                        "wave_height",
-                        "wave_direction",
-                        "wave_period",
-                        "wind_wave_height",
-                        "swell_wave_height",
-                    ]
+    def _build_range(
+            self,
+            lat: float,
+            lon: float,
+            start: date,
+            end: date,
+            weather: Dict[str, Any],
+            marine: Optional[Dict[str, Any]],
+            marine_skipped: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """One entry per date, shaped like ``_build_forecast`` minus coord."""
+        daily_index = {day: i for i, day in enumerate(weather.get("daily", {}).get("time") or [])}
+        hour_times = weather.get("hourly", {}).get("time") or []
+        marine_times = ((marine or {}).get("hourly") or {}).get("time") or []
+        marine_offset = self._marine_offset(hour_times, marine_times)
+
+        days = []
+        for offset in range((end - start).days + 1):
+            target = start + timedelta(days=offset)
+            day = target.isoformat()
+            entry: Dict[str, Any] = {
+                "date": day,
+                "daily": self._parse_daily_weather(weather, daily_index.get(day)),
+                "hourly": self._hourly_columns(
+                    weather, *self._day_span(hour_times, target), marine=marine, marine_offset=marine_offset
                 ),
-                "timezone": "auto",
             }
-            marine = self._get_json(self.MARINE_BASE, marine_params, allow_fail=True)
             if marine:
-                out["marine_daily"] = self._aggregate_marine_day(marine)
+                entry["marine_daily"] = self._aggregate_marine_day(
+                    marine, self._day_span(marine_times, target)
+                )
+            days.append(entry)
 
+        out: Dict[str, Any] = {
+            "coord": {"lat": lat, "lon": lon},
+            "start_date": start.isoformat(),
+            "end_date": end.isoformat(),
+            "days": days,
+        }
+        if marine_skipped:
+            out["marine_skipped"] = marine_skipped
+        self._attach_staleness(out, weather, marine)
         return out
 
-    # ---------------------------
-    # Internal helpers
-    # ---------------------------
+    @staticmethod
+    def _day_span(times: Sequence[str], day: date) -> Tuple[int, int]:
+        """
+        (first, stop) indices of ``day``'s hours, by binary search.
 
-    def _get_json(
-            self, url: str, params: Dict[str, Any], allow_fail: bool = False
-    ) -> Optional[Dict[str, Any]]:
-        try:
-            r = requests.get(url, params=params, timeout=self.timeout)
-            if r.status_code != 200:
-                if allow_fail:
-                    return None
-                raise OpenMeteoError(f"HTTP {r.status_code}: {r.text[:200]}")
-            data = r.json()
-            if isinstance(data, dict) and data.get("reason"):
-                if allow_fail:
-                    return None
-                raise OpenMeteoError(data["reason"])
-            return data
-        except requests.RequestException as e:
-            if allow_fail:
-                return None
-            raise OpenMeteoError(str(e)) from e
+        Open-Meteo's hourly stamps are ordered ISO strings that start with the
+        local date, so string order is time order: "2024-05-01" sorts right
+        before that day's first hour and "2024-05-02" right after its last.
+        """
+        first = bisect.bisect_left(times, day.isoformat())
+        stop = bisect.bisect_left(times, (day + timedelta(days=1)).isoformat(), first)
+        return first, stop
+
+    @staticmethod
+    def _attach_staleness(
+            out: Dict[str, Any],
+            weather: Dict[str, Any],
+            marine: Optional[Dict[str, Any]],
+    ) -> None:
+        """Report per-source age for payloads served from stale cache entries."""
+        staleness = {
+            name: payload[STALE_KEY]
+            for name, payload in (("weather", weather), ("marine", marine))
+            if payload and STALE_KEY in payload
+        }
+        if staleness:
+            out["staleness"] = staleness
+
+    def _realtime_plans(
+            self, coords: Sequence[Coord], with_marine: bool
+    ) -> Tuple[_BatchPlan, Optional[_BatchPlan]]:
+        weather = _BatchPlan(
+            self.WEATHER_BASE,
+            [self._realtime_weather_params(lat, lon) for lat, lon in coords],
+            self.cache,
+            self.BATCH_SIZE,
+        )
+        marine = _BatchPlan(
+            self.MARINE_BASE,
+            [self._realtime_marine_params(lat, lon) for lat, lon in coords],
+            self.cache,
+            self.BATCH_SIZE,
+        ) if with_marine else None
+        return weather, marine
+
+    def _forecast_plans(
+            self, coords: Sequence[Coord], target: date, with_marine: bool
+    ) -> Tuple[_BatchPlan, Optional[_BatchPlan]]:
+        weather = _BatchPlan(
+            self.WEATHER_BASE,
+            [self._forecast_weather_params(lat, lon, target) for lat, lon in coords],
+            self.cache,
+            self.BATCH_SIZE,
+        )
+        marine = _BatchPlan(
+            self.MARINE_BASE,
+            [self._forecast_marine_params(lat, lon, target) for lat, lon in coords],
+            self.cache,
+            self.BATCH_SIZE,
+        ) if with_marine else None
+        return weather, marine
+
+    @classmethod
+    def _build_many(
+            cls,
+            coords: Sequence[Coord],
+            weather: _BatchPlan,
+            marine: Optional[_BatchPlan],
+            build: Callable[..., Dict[str, Any]],
+            return_exceptions: bool,
+    ) -> List[Union[Dict[str, Any], OpenMeteoError]]:
+        out: List[Union[Dict[str, Any], OpenMeteoError]] = []
+        for i, (lat, lon) in enumerate(coords):
+            w = weather.results[i]
+            if isinstance(w, OpenMeteoError):
+                if not return_exceptions:
+                    raise w
+                out.append(w)
+                continue
+            m = marine.results[i] if marine is not None else None
+            skipped = None
+            if isinstance(m, OpenMeteoError):
+                m, skipped = None, cls._skip_reason(m)
+            out.append(build(lat, lon, w, m, skipped))
+        return out
+
+    @staticmethod
+    def _check_payload(data: Any) -> Dict[str, Any]:
+        if isinstance(data, dict) and data.get("reason"):
+            raise OpenMeteoError(data["reason"])
+        return data
 
     def _parse_current_weather(self, payload: Dict[str, Any]) -> Dict[str, Any]:
         # keep as instance method (uses self.WMO_CODE)
@@ -259,12 +2354,14 @@ class DiveWiseWeather:
         }
 
     @staticmethod
-    def _parse_daily_weather(payload: Dict[str, Any]) -> Dict[str, Any]:
+    def _parse_daily_weather(
+            payload: Dict[str, Any], index: Optional[int] = 0
+    ) -> Dict[str, Any]:
         daily = payload.get("daily", {})
 
         def first(arr_name: str) -> Optional[Any]:
             arr = daily.get(arr_name) or []
-            return arr[0] if arr else None
+            return arr[index] if index is not None and index < len(arr) else None
 
         return {
             "temperature_max_c": first("temperature_2m_max"),
@@ -281,11 +2378,15 @@ class DiveWiseWeather:
         }
 
     @staticmethod
-    def _aggregate_marine_day(payload: Dict[str, Any]) -> Dict[str, Any]:
+    def _aggregate_marine_day(
+            payload: Dict[str, Any], span: Optional[Tuple[int, int]] = None
+    ) -> Dict[str, Any]:
+        """Daily max/min over all marine hours, or hours ``span`` = (first, stop)."""
         hourly = payload.get("hourly", {})
 
         def arr(name: str) -> List[Optional[float]]:
-            return hourly.get(name) or []
+            values = hourly.get(name) or []
+            return values[span[0]:span[1]] if span is not None else values
 
         def safe_max(a: List[Optional[float]]) -> Optional[float]:
             vals = [x for x in a if isinstance(x, (int, float))]
@@ -304,35 +2405,863 @@ class DiveWiseWeather:
         }
 
     def _select_hourly_for_date(
-            self, payload: Dict[str, Any], target_day: date
-    ) -> List[Dict[str, Any]]:
+            self, payload: Dict[str, Any], target_day: date, marine: Optional[Dict[str, Any]] = None
+    ) -> HourlyColumns:
+        times: List[str] = payload.get("hourly", {}).get("time") or []
+        return self._hourly_columns(payload, *self._day_span(times, target_day), marine=marine)
+
+    @staticmethod
+    def _marine_offset(times: Sequence[str], marine_times: Sequence[str]) -> Optional[int]:
+        """
+        ``d`` such that marine hour ``i + d`` is weather hour ``i``, or None
+        when the two series are not on the same hourly grid.
+
+        Both endpoints are asked for the same dates and ``timezone=auto``, so
+        the grids normally coincide; checking the two ends of the overlap is
+        enough to trust the offset for every hour in between.
+        """
+        if not times or not marine_times:
+            return None
+        if marine_times[0] <= times[0]:
+            j = bisect.bisect_left(marine_times, times[0])
+            offset = j
+        else:
+            j = bisect.bisect_left(times, marine_times[0])
+            offset = -j
+        last = min(len(times), len(marine_times) - offset) - 1
+        if last < max(0, -offset):
+            return None
+        if times[max(0, -offset)] != marine_times[max(0, -offset) + offset]:
+            return None
+        if times[last] != marine_times[last + offset]:
+            return None
+        return offset
+
+    def _hourly_columns(
+            self,
+            payload: Dict[str, Any],
+            first: int,
+            stop: int,
+            marine: Optional[Dict[str, Any]] = None,
+            marine_offset: Optional[int] = None,
+    ) -> HourlyColumns:
+        """
+        Hours [first, stop) of an Open-Meteo weather payload, renamed per field.
+
+        With a ``marine`` payload, its hourly wave fields are joined on by
+        timestamp: as zero-copy views shifted by ``marine_offset`` (computed
+        here if not given) when the grids line up, by a time lookup otherwise.
+        """
         hourly = payload.get("hourly", {})
-        times: List[str] = hourly.get("time") or []
-        result = []
 
-        def val(name: str, t: int) -> Optional[Any]:
-            arr = hourly.get(name) or []
-            return arr[t] if t < len(arr) else None
+        def col(name: str) -> List[Optional[Any]]:
+            values = (hourly.get(name) or [])[first:stop]
+            if len(values) < stop - first:  # short column: pad like a missing value
+                values += [None] * (stop - first - len(values))
+            return values
+
+        times = col("time")
+        codes = col("weather_code")
+        columns: Dict[str, Sequence[Any]] = {
+            "time": times,
+            "temperature_2m_c": col("temperature_2m"),
+            "apparent_temperature_c": col("apparent_temperature"),
+            "precipitation_mm": col("precipitation"),
+            "rain_mm": col("rain"),
+            "cloud_cover_pct": col("cloud_cover"),
+            "wind_speed_10m_kmh": col("wind_speed_10m"),
+            "wind_gusts_10m_kmh": col("wind_gusts_10m"),
+            "wind_direction_10m_deg": col("wind_direction_10m"),
+            "weather_code": codes,
+            "weather_text": [self.WMO_CODE.get(code) for code in codes],
+        }
+        if marine:
+            marine_hourly = marine.get("hourly") or {}
+            if marine_offset is None:
+                marine_offset = self._marine_offset(
+                    hourly.get("time") or [], marine_hourly.get("time") or []
+                )
+            if marine_offset is not None:
+                for name, out_name in self.MARINE_HOURLY.items():
+                    columns[out_name] = ColumnView(
+                        marine_hourly.get(name) or [], first + marine_offset, stop - first
+                    )
+            else:
+                index = {t: i for i, t in enumerate(marine_hourly.get("time") or [])}
+                rows = [index.get(t) for t in times]
+                for name, out_name in self.MARINE_HOURLY.items():
+                    values = marine_hourly.get(name) or []
+                    columns[out_name] = [
+                        values[i] if i is not None and i < len(values) else None for i in rows
+                    ]
+        return HourlyColumns(columns)
+
+
+class DiveWiseWeather(_DiveWiseBase):
+    """
+    Lightweight client for Open-Meteo weather & marine data.
+
+    Endpoints:
+      - Weather: https://api.open-meteo.com/v1/forecast
+      - Marine : https://marine-api.open-meteo.com/v1/marine
+    """
+
+    @property
+    def session(self) -> requests.Session:
+        return shared_session(self.pool)
+
+    def pool_stats(self) -> Dict[str, int]:
+        """Keep-alive hit/miss counters for this client's shared session."""
+        return _session_pool_stats(self.pool)
+
+    # ---------------------------
+    # Public API
+    # ---------------------------
+
+    def get_realtime(self, lat: float, lon: float) -> Dict[str, Any]:
+        """
+        Get real-time conditions for a coordinate.
+        """
+        weather, marine, skipped = self._fetch_weather_and_marine(
+            self._realtime_weather_params(lat, lon),
+            self._realtime_marine_params(lat, lon)
+            if self.include_marine else None,
+            self._deadline(),
+        )
+        return self._build_realtime(lat, lon, weather, marine, skipped)
+
+    def get_forecast_for_date(
+            self, lat: float, lon: float, date_str: str
+    ) -> Dict[str, Any]:
+        """
+        Get a daily summary + hourly series (``HourlyColumns``) for a specific
+        date (local time).
+        """
+        target = self._parse_date(date_str)
+        weather, marine, skipped = self._fetch_weather_and_marine(
+            self._forecast_weather_params(lat, lon, target),
+            self._forecast_marine_params(lat, lon, target)
+            if self.include_marine else None,
+            self._deadline(),
+        )
+        return self._build_forecast(lat, lon, target, weather, marine, skipped)
+
+    def get_forecast_range(
+            self, lat: float, lon: float, start_str: str, end_str: str
+    ) -> Dict[str, Any]:
+        """
+        Daily summary + hourly series for every date from ``start_str`` to
+        ``end_str`` inclusive (local time, at most ``MAX_RANGE_DAYS``), fetched
+        with one weather and one marine request. Entries are under ``days``.
+        """
+        start, end = self._parse_range(start_str, end_str)
+        weather, marine, skipped = self._fetch_weather_and_marine(
+            self._forecast_weather_params(lat, lon, start, end),
+            self._forecast_marine_params(lat, lon, start, end)
+            if self.include_marine else None,
+            self._deadline(),
+        )
+        return self._build_range(lat, lon, start, end, weather, marine, skipped)
+
+    def get_realtime_many(
+            self, coords: Iterable[Coord], return_exceptions: bool = False
+    ) -> List[Union[Dict[str, Any], OpenMeteoError]]:
+        """
+        Real-time conditions for many (lat, lon) pairs, ``BATCH_SIZE`` per upstream call.
+
+        Results are in input order and shaped like ``get_realtime``. With
+        ``return_exceptions=True`` a failed weather batch yields OpenMeteoError
+        items for its sites instead of raising.
+        """
+        coords = list(coords)
+        deadline = self._deadline(batch=True)
+        weather, marine = self._realtime_plans(coords, self.include_marine)
+        self._fetch_plans(weather, marine, deadline=deadline)
+        return self._build_many(
+            coords, weather, marine, self._build_realtime, return_exceptions
+        )
+
+    def get_forecast_for_date_many(
+            self, coords: Iterable[Coord], date_str: str, return_exceptions: bool = False
+    ) -> List[Union[Dict[str, Any], OpenMeteoError]]:
+        """
+        ``get_forecast_for_date`` for many (lat, lon) pairs, batched like ``get_realtime_many``.
+        """
+        coords = list(coords)
+        target = self._parse_date(date_str)
+        deadline = self._deadline(batch=True)
+        weather, marine = self._forecast_plans(coords, target, self.include_marine)
+        self._fetch_plans(weather, marine, deadline=deadline)
+        return self._build_many(
+            coords,
+            weather,
+            marine,
+            lambda lat, lon, w, m, sk: self._build_forecast(lat, lon, target, w, m, sk),
+            return_exceptions,
+        )
+
+    # ---------------------------
+    # Internal helpers
+    # ---------------------------
+
+    def _fetch_plans(
+            self, *plans: Optional[_BatchPlan], deadline: Optional[float] = None
+    ) -> None:
+        """Run every chunk of every plan concurrently on the shared pool, within ``deadline``."""
+        for plan in plans:
+            if plan is not None:
+                plan.split(plan.lookup())
+        pending = [
+            (plan, idxs, fetch_executor().submit(self._request_json, plan.url, params, deadline))
+            for plan in plans if plan is not None
+            for idxs, params in plan.chunks
+        ]
+        for plan, idxs, future in pending:
+            try:
+                plan.resolve(idxs, future.result())
+            except OpenMeteoError as e:
+                plan.fail(idxs, e)
+
+    def _fetch_weather_and_marine(
+            self,
+            weather_params: Dict[str, Any],
+            marine_params: Optional[Dict[str, Any]],
+            deadline: Optional[float] = None,
+    ) -> Tuple[Dict[str, Any], Optional[Dict[str, Any]], Optional[str]]:
+        """
+        Fetch weather in the calling thread while marine runs on the shared pool.
+
+        Marine stays best-effort: its errors are swallowed (the third item says
+        why sea state was skipped, if not simply failed), and a weather error
+        is raised straight away without waiting for marine.
+        """
+        if marine_params is None:
+            weather = self._get_json(self.WEATHER_BASE, weather_params, deadline=deadline)
+            return weather, None, None
+
+        marine_future = fetch_executor().submit(self._get_marine, marine_params, deadline)
+        try:
+            weather = self._get_json(self.WEATHER_BASE, weather_params, deadline=deadline)
+        except BaseException:
+            marine_future.cancel()
+            raise
+        try:
+            wait_s = None if deadline is None else max(deadline - time.monotonic(), 0.0)
+            marine, skipped = marine_future.result(timeout=wait_s)
+        except Exception:
+            marine, skipped = None, None
+        return weather, marine, skipped
+
+    def _get_marine(
+            self, params: Dict[str, Any], deadline: Optional[float]
+    ) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+        """
+        Marine payload (from the cache, upstream or a stale fallback), or None
+        and why sea state was skipped.
+        """
+        try:
+            return self._fetch(self.MARINE_BASE, params, deadline), None
+        except OpenMeteoError as e:
+            return None, self._skip_reason(e)
+
+    def _get_json(
+            self,
+            url: str,
+            params: Dict[str, Any],
+            deadline: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        return self._fetch(url, params, deadline)
+
+    def _fetch(
+            self, url: str, params: Dict[str, Any], deadline: Optional[float] = None
+    ) -> Dict[str, Any]:
+        params, key = self._keyed(url, params)
+        entry = self.cache.lookup(key) if self.cache is not None else None
+        cached = self._from_cache(url, params, key, entry)
+        if cached is not None:
+            return cached
+        try:
+            if not self.coalesce:
+                return self._load(url, params, key, deadline)
+            return _FLIGHTS.do(key, lambda: self._load(url, params, key, deadline))
+        except OpenMeteoError:
+            fallback = self._fallback(entry)
+            if fallback is None:
+                raise
+            return fallback
+
+    def _revalidate(self, url: str, params: Dict[str, Any], key: Hashable) -> None:
+        """Refresh ``key`` on a worker thread unless a fetch for it is in flight."""
+        if not _FLIGHTS.in_flight(key):
+            fetch_executor().submit(_FLIGHTS.do, key, lambda: self._load(url, params, key))
+
+    def _load(
+            self,
+            url: str,
+            params: Dict[str, Any],
+            key: Hashable,
+            deadline: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        data = self._request_json(url, params, deadline)
+        self._store(key, params, data)
+        return data
+
+    def _request_json(
+            self, url: str, params: Dict[str, Any], deadline: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """Send (hedged if configured), retrying transient failures per ``self.retry``."""
+        self._start_attempts(url)
+        send = self._hedged if self._hedges(params) else self._send
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                data = send(url, params, deadline)
+            except OpenMeteoError as e:
+                delay = self._retry_delay(url, attempt, e, deadline)
+                if delay is None:
+                    raise
+                time.sleep(delay)
+                continue
+            self._record_attempts(url, attempt)
+            return data
+
+    def _hedged(
+            self, url: str, params: Dict[str, Any], deadline: Optional[float]
+    ) -> Dict[str, Any]:
+        _HEDGES.request(url)
+        sending = threading.Event()
+        primary = hedge_executor().submit(self._send, url, params, deadline, sending)
+        # the hedge delay runs from the GET itself, not its rate-limit queueing
+        sending.wait()
+        try:
+            return primary.result(timeout=self.hedge.delay_for(url))
+        except FutureTimeout:
+            pass
+        if not _HEDGES.try_hedge(url, self.hedge.max_ratio):
+            return primary.result()
+
+        secondary = hedge_executor().submit(self._send, url, params, deadline)
+        pending = {primary, secondary}
+        error: Optional[BaseException] = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is secondary:
+                        _HEDGES.won(url)
+                    return future.result()
+                error = error or future.exception()
+        raise error
+
+    def _send(
+            self,
+            url: str,
+            params: Dict[str, Any],
+            deadline: Optional[float] = None,
+            sending: Optional[threading.Event] = None,
+    ) -> Dict[str, Any]:
+        """
+        One upstream GET; records its latency when it succeeds. ``sending`` is
+        set once the GET holds its rate-limit token and slot, or has failed.
+        """
+        try:
+            limiter = self._limiter()
+            if limiter is None:
+                if sending is not None:
+                    sending.set()
+                return self._get(url, params, deadline)
+            for _ in range(limiter.config.max_requeues + 1):
+                self._queue(limiter, self._call_cost(params), deadline)
+                try:
+                    with limiter.slot(self._slot_budget(deadline)):
+                        if sending is not None:
+                            sending.set()
+                        return self._get(url, params, deadline, throttle=True)
+                except _Throttled as e:
+                    limiter.pause(e.pause)
+            raise self._requeues_exhausted(url, limiter)
+        finally:
+            if sending is not None:
+                sending.set()
+
+    def _queue(self, limiter: RateLimiter, cost: float, deadline: Optional[float]) -> None:
+        """
+        Wait for ``cost`` rate-limit tokens. A multi-site chunk is bulk: it
+        takes its tokens just before sending instead of booking ahead.
+        """
+        bulk = cost > 1
+        until = self._queue_until(limiter, deadline)
+        while True:
+            wait_s = limiter.reserve(cost, until - time.monotonic(), bulk)
+            time.sleep(wait_s)
+            if not (bulk and wait_s):
+                return
+
+    def _get(
+            self,
+            url: str,
+            params: Dict[str, Any],
+            deadline: Optional[float],
+            throttle: bool = False,
+    ) -> Dict[str, Any]:
+        """
+        Send the GET through the endpoint's circuit breaker. With
+        ``throttle``, a 429 raises _Throttled so the caller can queue again.
+        """
+        connect, read = self._timeouts_for(url, params, deadline)
+        with self._guarded(url):
+            started = time.monotonic()
+            try:
+                r = self.session.get(url, params=params, timeout=(connect, read))
+            except requests.ConnectionError as e:
+                raise TransientError(str(e)) from e
+            except requests.Timeout as e:
+                raise UpstreamTimeout(str(e)) from e
+            except requests.RequestException as e:
+                raise OpenMeteoError(str(e)) from e
+            self._throttle(r.status_code, r.headers, throttle)
+            return self._payload(url, params, r.status_code, r.headers, r.content, started)
+
+
+class AsyncDiveWiseWeather(_DiveWiseBase):
+    """
+    asyncio flavour of DiveWiseWeather built on a pooled ``httpx.AsyncClient``.
+
+    Same public API, but ``get_realtime`` / ``get_forecast_for_date`` are
+    coroutines and weather + marine are awaited concurrently.
+    """
+
+    def __init__(
+            self,
+            timeout: int = 15,
+            include_marine: bool = True,
+            pool: Optional[PoolConfig] = None,
+            cache: Optional[ResponseCache] = None,
+            coalesce: bool = True,
+            hedge: Optional[HedgePolicy] = None,
+            breaker: Optional[BreakerConfig] = None,
+            timeouts: Optional[TimeoutPolicy] = None,
+            rate_limit: Optional[RateLimitConfig] = None,
+            retry: Optional[RetryPolicy] = None,
+            json_decoder: Optional[JSONDecoder] = None,
+    ):
+        if httpx is None:
+            raise ImportError("AsyncDiveWiseWeather requires httpx (pip install httpx)")
+        super().__init__(
+            timeout=timeout,
+            include_marine=include_marine,
+            pool=pool,
+            cache=cache,
+            coalesce=coalesce,
+            hedge=hedge,
+            breaker=breaker,
+            timeouts=timeouts,
+            rate_limit=rate_limit,
+            retry=retry,
+            json_decoder=json_decoder,
+        )
+
+    @property
+    def http(self) -> "httpx.AsyncClient":
+        return shared_async_client(self.pool)
+
+    def pool_stats(self) -> Dict[str, int]:
+        """Keep-alive hit/miss counters for this client's shared ``httpx`` pool."""
+        return _async_pool_stats(self.pool)
+
+    # ---------------------------
+    # Public API
+    # ---------------------------
+
+    async def get_realtime(self, lat: float, lon: float) -> Dict[str, Any]:
+        """
+        Get real-time conditions for a coordinate.
+        """
+        weather, marine, skipped = await self._fetch_weather_and_marine(
+            self._realtime_weather_params(lat, lon),
+            self._realtime_marine_params(lat, lon)
+            if self.include_marine else None,
+            self._deadline(),
+        )
+        return self._build_realtime(lat, lon, weather, marine, skipped)
+
+    async def get_forecast_for_date(
+            self, lat: float, lon: float, date_str: str
+    ) -> Dict[str, Any]:
+        """
+        Get a daily summary + hourly series (``HourlyColumns``) for a specific
+        date (local time).
+        """
+        target = self._parse_date(date_str)
+        weather, marine, skipped = await self._fetch_weather_and_marine(
+            self._forecast_weather_params(lat, lon, target),
+            self._forecast_marine_params(lat, lon, target)
+            if self.include_marine else None,
+            self._deadline(),
+        )
+        return self._build_forecast(lat, lon, target, weather, marine, skipped)
+
+    async def get_forecast_range(
+            self, lat: float, lon: float, start_str: str, end_str: str
+    ) -> Dict[str, Any]:
+        """
+        Daily summary + hourly series for every date from ``start_str`` to
+        ``end_str`` inclusive (local time, at most ``MAX_RANGE_DAYS``), fetched
+        with one weather and one marine request. Entries are under ``days``.
+        """
+        start, end = self._parse_range(start_str, end_str)
+        weather, marine, skipped = await self._fetch_weather_and_marine(
+            self._forecast_weather_params(lat, lon, start, end),
+            self._forecast_marine_params(lat, lon, start, end)
+            if self.include_marine else None,
+            self._deadline(),
+        )
+        return self._build_range(lat, lon, start, end, weather, marine, skipped)
+
+    async def get_realtime_many(
+            self, coords: Iterable[Coord], return_exceptions: bool = False
+    ) -> List[Union[Dict[str, Any], OpenMeteoError]]:
+        """
+        Real-time conditions for many (lat, lon) pairs, ``BATCH_SIZE`` per upstream call.
+        """
+        coords = list(coords)
+        deadline = self._deadline(batch=True)
+        weather, marine = self._realtime_plans(coords, self.include_marine)
+        await self._fetch_plans(weather, marine, deadline=deadline)
+        return self._build_many(
+            coords, weather, marine, self._build_realtime, return_exceptions
+        )
+
+    async def get_forecast_for_date_many(
+            self, coords: Iterable[Coord], date_str: str, return_exceptions: bool = False
+    ) -> List[Union[Dict[str, Any], OpenMeteoError]]:
+        """
+        ``get_forecast_for_date`` for many (lat, lon) pairs, batched like ``get_realtime_many``.
+        """
+        coords = list(coords)
+        target = self._parse_date(date_str)
+        deadline = self._deadline(batch=True)
+        weather, marine = self._forecast_plans(coords, target, self.include_marine)
+        await self._fetch_plans(weather, marine, deadline=deadline)
+        return self._build_many(
+            coords,
+            weather,
+            marine,
+            lambda lat, lon, w, m, sk: self._build_forecast(lat, lon, target, w, m, sk),
+            return_exceptions,
+        )
+
+    def iter_realtime_many(
+            self, coords: Iterable[Coord]
+    ) -> AsyncIterator[Tuple[int, Union[Dict[str, Any], OpenMeteoError]]]:
+        """
+        Stream ``(index, result)`` pairs for many sites as each batch completes.
+
+        Results arrive out of order; failures are yielded as OpenMeteoError.
+        At most ``STREAM_WINDOWS`` batches are held at once, so memory stays
+        flat however many coordinates are passed.
+        """
+        return self._iter_many(coords, self._realtime_plans, self._build_realtime)
+
+    def iter_forecast_for_date_many(
+            self, coords: Iterable[Coord], date_str: str
+    ) -> AsyncIterator[Tuple[int, Union[Dict[str, Any], OpenMeteoError]]]:
+        """
+        Streaming counterpart of ``get_forecast_for_date_many`` (see ``iter_realtime_many``).
+        """
+        target = self._parse_date(date_str)
+        return self._iter_many(
+            coords,
+            lambda window, with_marine: self._forecast_plans(window, target, with_marine),
+            lambda lat, lon, w, m, sk: self._build_forecast(lat, lon, target, w, m, sk),
+        )
+
+    # ---------------------------
+    # Internal helpers
+    # ---------------------------
+
+    async def _iter_many(
+            self,
+            coords: Iterable[Coord],
+            plans_for: Callable[..., Tuple[_BatchPlan, Optional[_BatchPlan]]],
+            build: Callable[..., Dict[str, Any]],
+    ) -> AsyncIterator[Tuple[int, Union[Dict[str, Any], OpenMeteoError]]]:
+        async def run(offset: int, window: List[Coord]):
+            # a budget per window: a long stream may outlast any one deadline
+            weather, marine = plans_for(window, self.include_marine)
+            await self._fetch_plans(weather, marine, deadline=self._deadline(batch=True))
+            return offset, self._build_many(window, weather, marine, build, True)
+
+        def windows():
+            window: List[Coord] = []
+            offset = 0
+            for coord in coords:
+                window.append(coord)
+                if len(window) == self.BATCH_SIZE:
+                    yield offset, window
+                    offset += len(window)
+                    window = []
+            if window:
+                yield offset, window
+
+        pending: set = set()
+        source = windows()
+        try:
+            while True:
+                for offset, window in source:
+                    pending.add(asyncio.ensure_future(run(offset, window)))
+                    if len(pending) >= self.STREAM_WINDOWS:
+                        break
+                if not pending:
+                    return
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    offset, results = task.result()
+                    for j, result in enumerate(results):
+                        yield offset + j, result
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def _fetch_plans(
+            self, *plans: Optional[_BatchPlan], deadline: Optional[float] = None
+    ) -> None:
+        """Run every chunk of every plan concurrently, within ``deadline``."""
+        for plan in plans:
+            if plan is not None:
+                plan.split(await plan.alookup())
+        chunks = [
+            (plan, idxs, params)
+            for plan in plans if plan is not None
+            for idxs, params in plan.chunks
+        ]
+        payloads = await asyncio.gather(
+            *(self._request_json(plan.url, params, deadline) for plan, _, params in chunks),
+            return_exceptions=True,
+        )
+        for (plan, idxs, _), payload in zip(chunks, payloads):
+            if isinstance(payload, OpenMeteoError):
+                plan.fail(idxs, payload)
+            elif isinstance(payload, BaseException):
+                raise payload
+            else:
+                plan.resolve(idxs, payload)
+
+    async def _fetch_weather_and_marine(
+            self,
+            weather_params: Dict[str, Any],
+            marine_params: Optional[Dict[str, Any]],
+            deadline: Optional[float] = None,
+    ) -> Tuple[Dict[str, Any], Optional[Dict[str, Any]], Optional[str]]:
+        """
+        Await weather and marine together; marine errors are swallowed (the
+        third item says why sea state was skipped, if not simply failed) and a
+        weather error cancels the marine task instead of waiting on it.
+        """
+        if marine_params is None:
+            weather = await self._get_json(self.WEATHER_BASE, weather_params, deadline=deadline)
+            return weather, None, None
+
+        marine_task = asyncio.ensure_future(self._get_marine(marine_params, deadline))
+        try:
+            weather = await self._get_json(self.WEATHER_BASE, weather_params, deadline=deadline)
+        except BaseException:
+            marine_task.cancel()
+            raise
+        try:
+            marine, skipped = await marine_task
+        except Exception:
+            marine, skipped = None, None
+        return weather, marine, skipped
+
+    async def _get_marine(
+            self, params: Dict[str, Any], deadline: Optional[float]
+    ) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+        """
+        Marine payload (from the cache, upstream or a stale fallback), or None
+        and why sea state was skipped.
+        """
+        try:
+            return await self._fetch(self.MARINE_BASE, params, deadline), None
+        except OpenMeteoError as e:
+            return None, self._skip_reason(e)
+
+    async def _get_json(
+            self,
+            url: str,
+            params: Dict[str, Any],
+            deadline: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        return await self._fetch(url, params, deadline)
+
+    async def _fetch(
+            self, url: str, params: Dict[str, Any], deadline: Optional[float] = None
+    ) -> Dict[str, Any]:
+        params, key = self._keyed(url, params)
+        entry = await self.cache.alookup(key) if self.cache is not None else None
+        cached = self._from_cache(url, params, key, entry)
+        if cached is not None:
+            return cached
+        try:
+            if not self.coalesce:
+                return await self._load(url, params, key, deadline)
+            return await _ASYNC_FLIGHTS.do(
+                key, lambda: self._load(url, params, key, deadline)
+            )
+        except OpenMeteoError:
+            fallback = self._fallback(entry)
+            if fallback is None:
+                raise
+            return fallback
+
+    def _revalidate(self, url: str, params: Dict[str, Any], key: Hashable) -> None:
+        """Refresh ``key`` in a background task unless a fetch for it is in flight."""
+        if not _ASYNC_FLIGHTS.in_flight(key):
+            _ASYNC_FLIGHTS.start(key, lambda: self._load(url, params, key))
+
+    async def _load(
+            self,
+            url: str,
+            params: Dict[str, Any],
+            key: Hashable,
+            deadline: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        data = await self._request_json(url, params, deadline)
+        self._store(key, params, data)
+        return data
+
+    async def _request_json(
+            self, url: str, params: Dict[str, Any], deadline: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """Send (hedged if configured), retrying transient failures per ``self.retry``."""
+        self._start_attempts(url)
+        send = self._hedged if self._hedges(params) else self._send
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                data = await send(url, params, deadline)
+            except OpenMeteoError as e:
+                delay = self._retry_delay(url, attempt, e, deadline)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+                continue
+            self._record_attempts(url, attempt)
+            return data
+
+    async def _hedged(
+            self, url: str, params: Dict[str, Any], deadline: Optional[float]
+    ) -> Dict[str, Any]:
+        _HEDGES.request(url)
+        sending = asyncio.Event()
+        primary = asyncio.ensure_future(self._send(url, params, deadline, sending))
+        pending = {primary}
+        try:
+            # the hedge delay runs from the GET itself, not its rate-limit queueing
+            await sending.wait()
+            done, _ = await asyncio.wait(pending, timeout=self.hedge.delay_for(url))
+            if done or not _HEDGES.try_hedge(url, self.hedge.max_ratio):
+                return await primary
+
+            secondary = asyncio.ensure_future(self._send(url, params, deadline))
+            pending.add(secondary)
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is None:
+                        if task is secondary:
+                            _HEDGES.won(url)
+                        return task.result()
+                    error = error or task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def _send(
+            self,
+            url: str,
+            params: Dict[str, Any],
+            deadline: Optional[float] = None,
+            sending: Optional[asyncio.Event] = None,
+    ) -> Dict[str, Any]:
+        """
+        One upstream GET; records its latency when it succeeds. ``sending`` is
+        set once the GET holds its rate-limit token and slot, or has failed.
+        """
+        try:
+            limiter = self._limiter()
+            if limiter is None:
+                if sending is not None:
+                    sending.set()
+                return await self._get(url, params, deadline)
+            for _ in range(limiter.config.max_requeues + 1):
+                await self._queue(limiter, self._call_cost(params), deadline)
+                try:
+                    async with limiter.aslot(self._slot_budget(deadline)):
+                        if sending is not None:
+                            sending.set()
+                        return await self._get(url, params, deadline, throttle=True)
+                except _Throttled as e:
+                    await limiter.apause(e.pause)
+            raise self._requeues_exhausted(url, limiter)
+        finally:
+            if sending is not None:
+                sending.set()
+
+    async def _queue(
+            self, limiter: RateLimiter, cost: float, deadline: Optional[float]
+    ) -> None:
+        """
+        Wait for ``cost`` rate-limit tokens. A multi-site chunk is bulk: it
+        takes its tokens just before sending instead of booking ahead.
+        """
+        bulk = cost > 1
+        until = self._queue_until(limiter, deadline)
+        while True:
+            wait_s = await limiter.areserve(cost, until - time.monotonic(), bulk)
+            await asyncio.sleep(wait_s)
+            if not (bulk and wait_s):
+                return
 
-        for i, ts in enumerate(times):
+    async def _get(
+            self,
+            url: str,
+            params: Dict[str, Any],
+            deadline: Optional[float],
+            throttle: bool = False,
+    ) -> Dict[str, Any]:
+        """
+        Send the GET through the endpoint's circuit breaker. With
+        ``throttle``, a 429 raises _Throttled so the caller can queue again.
+        """
+        connect, read = self._timeouts_for(url, params, deadline)
+        with self._guarded(url):
+            started = time.monotonic()
             try:
-                dt = datetime.fromisoformat(ts)
-            except ValueError:
-                dt = datetime.fromisoformat(ts.replace("Z", "+00:00"))
-            if dt.date() == target_day:
-                result.append(
-                    {
-                        "time": ts,
-                        "temperature_2m_c": val("temperature_2m", i),
-                        "apparent_temperature_c": val("apparent_temperature", i),
-                        "precipitation_mm": val("precipitation", i),
-                        "rain_mm": val("rain", i),
-                        "cloud_cover_pct": val("cloud_cover", i),
-                        "wind_speed_10m_kmh": val("wind_speed_10m", i),
-                        "wind_gusts_10m_kmh": val("wind_gusts_10m", i),
-                        "wind_direction_10m_deg": val("wind_direction_10m", i),
-                        "weather_code": val("weather_code", i),
-                        "weather_text": self.WMO_CODE.get(val("weather_code", i)),
-                    }
+                r = await self.http.get(
+                    url, params=params, timeout=httpx.Timeout(read, connect=connect)
                 )
-        return result
+            except (
+                    httpx.ConnectError,
+                    httpx.ConnectTimeout,
+                    httpx.ReadError,
+                    httpx.WriteError,
+                    httpx.RemoteProtocolError,
+            ) as e:
+                # the async twin of requests.ConnectionError: a dropped pooled connection
+                # surfaces as ReadError/WriteError, and a GET is safe to resend
+                raise TransientError(str(e)) from e
+            except (httpx.ReadTimeout, httpx.WriteTimeout) as e:
+                raise UpstreamTimeout(str(e)) from e
+            except httpx.HTTPError as e:
+                raise OpenMeteoError(str(e)) from e
+            self._throttle(r.status_code, r.headers, throttle)
+            return self._payload(url, params, r.status_code, r.headers, r.content, started)
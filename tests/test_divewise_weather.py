@@ -0,0 +1,485 @@
+"""
+Upstream call policy of the weather clients: circuit breaking, the rate
+limiter's token bucket and connection reuse, driven either directly or through
+AsyncDiveWiseWeather against a mocked (or local) Open-Meteo; the response
+caches; and the join of hourly marine series onto the weather hours.
+"""
+
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import pytest
+
+import divewise_weather as dw
+from divewise_weather import (
+    AsyncDiveWiseWeather, BreakerConfig, CircuitBreaker, CircuitOpenError, OpenMeteoError,
+    HedgePolicy, LatencyTracker, PoolConfig, RateLimitConfig, RateLimited, RateLimiter,
+    ResponseCache, RetryPolicy, SQLiteResponseCache, TimeoutPolicy,
+)
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(time, "monotonic", clock)
+    return clock
+
+
+@pytest.fixture
+def wall(monkeypatch):
+    """Fake ``time.time`` (cache expiry is wall-clock)."""
+    wall = Clock()
+    monkeypatch.setattr(time, "time", wall)
+    return wall
+
+
+BREAKER = BreakerConfig(min_calls=4, failure_rate=0.5, slow_call_s=5.0, slow_rate=0.8)
+
+
+def test_breaker_trips_on_failure_rate(clock):
+    breaker = CircuitBreaker(BREAKER)
+    for ok in (True, False, True):
+        breaker.record(ok, 0.1)
+    assert breaker.state == breaker.CLOSED  # below min_calls
+    breaker.record(False, 0.1)
+    assert breaker.state == breaker.OPEN
+    assert not breaker.allow()
+    assert breaker.stats() == {"state": "open", "trips": 1, "rejected": 1}
+
+
+def test_breaker_trips_on_slow_rate(clock):
+    breaker = CircuitBreaker(BREAKER)
+    for _ in range(4):
+        breaker.record(True, 6.0)
+    assert breaker.state == breaker.OPEN
+
+
+def test_breaker_forgets_calls_outside_window(clock):
+    breaker = CircuitBreaker(BREAKER)
+    for _ in range(3):
+        breaker.record(False, 0.1)
+    clock.now += BREAKER.window_s + 1
+    breaker.record(False, 0.1)
+    assert breaker.state == breaker.CLOSED
+
+
+def test_breaker_half_open_probe_closes_or_reopens(clock):
+    breaker = CircuitBreaker(BREAKER)
+    for _ in range(4):
+        breaker.record(False, 0.1)
+    clock.now += BREAKER.cooldown_s
+    assert breaker.allow()  # the one probe
+    assert breaker.state == breaker.HALF_OPEN
+    assert not breaker.allow()
+
+    breaker.record(False, 0.1)  # failed probe: open again, cooldown restarts
+    assert breaker.state == breaker.OPEN and breaker.trips == 2
+    clock.now += BREAKER.cooldown_s - 1
+    assert not breaker.allow()
+
+    clock.now += 1
+    assert breaker.allow()
+    breaker.release()  # probe never completed: its slot is free again
+    assert breaker.allow()
+    breaker.record(True, 0.1)
+    assert breaker.state == breaker.CLOSED
+    assert breaker.allow() and breaker.allow()
+
+
+def _client(monkeypatch, handler, delay: float = 0.0, **options) -> AsyncDiveWiseWeather:
+    """
+    Client whose GETs go to ``handler`` (status, json[, headers]), answered
+    after ``delay`` seconds, with a fresh breaker registry.
+    """
+    monkeypatch.setattr(dw, "_BREAKERS", {})
+
+    async def respond(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(delay)
+        status, body, *headers = handler(request)
+        return httpx.Response(status, json=body, headers=headers[0] if headers else None)
+
+    http = httpx.AsyncClient(transport=httpx.MockTransport(respond))
+    monkeypatch.setattr(AsyncDiveWiseWeather, "http", property(lambda self: http))
+    options.setdefault("breaker", BreakerConfig())
+    return AsyncDiveWiseWeather(include_marine=False, coalesce=False, **options)
+
+
+def _realtime(request: httpx.Request):
+    lat = float(request.url.params["latitude"])
+    if not -90 <= lat <= 90:
+        return 400, {"error": True, "reason": "Latitude must be in range of -90 to 90°."}
+    return 200, {"current": {"time": "2024-07-01T12:00", "weather_code": 0}}
+
+
+def test_bad_input_does_not_trip_breaker(monkeypatch):
+    client = _client(monkeypatch, _realtime)
+
+    async def run():
+        for _ in range(10):
+            with pytest.raises(OpenMeteoError, match="HTTP 400"):
+                await client.get_realtime(999.0, 14.5)
+        return await client.get_realtime(35.9, 14.5)
+
+    assert asyncio.run(run())["weather"]["weather_code"] == 0
+    assert dw.breaker_stats()[client.WEATHER_BASE]["state"] == "closed"
+
+
+def test_server_errors_trip_breaker(monkeypatch):
+    client = _client(monkeypatch, lambda request: (500, {"reason": "boom"}))
+
+    async def run():
+        for _ in range(10):
+            with pytest.raises(OpenMeteoError, match="HTTP 500"):
+                await client.get_realtime(35.9, 14.5)
+        with pytest.raises(CircuitOpenError):
+            await client.get_realtime(35.9, 14.5)
+
+    asyncio.run(run())
+    assert dw.breaker_stats()[client.WEATHER_BASE] == {
+        "state": "open", "trips": 1, "rejected": 1,
+    }
+
+
+def test_rate_limit_queueing_does_not_trip_breaker(monkeypatch):
+    # every call but the first queues >= 0.1 s for a token; the GETs are instant
+    limit = RateLimitConfig(rate=10.0, burst=1.0, interactive_reserve=0.0)
+    breaker = BreakerConfig(min_calls=4, slow_call_s=0.1)
+    client = _client(monkeypatch, _realtime, rate_limit=limit, breaker=breaker)
+
+    async def run():
+        return await asyncio.gather(*(client.get_realtime(35.9, 14.5) for _ in range(6)))
+
+    assert len(asyncio.run(run())) == 6
+    assert dw.breaker_stats()[client.WEATHER_BASE]["state"] == "closed"
+
+
+def test_retries_draw_on_the_retry_budget(monkeypatch):
+    monkeypatch.setattr(dw, "_RETRIES", dw._RetryBudget())
+    # no backoff, no time-based refill: each call earns half a retry, two banked
+    retry = RetryPolicy(
+        max_attempts=3, base_delay_s=0.0, min_retries_per_s=0.0,
+        budget_ratio=0.5, budget_burst=2.0,
+    )
+    client = _client(monkeypatch, lambda request: (503, {"reason": "busy"}), retry=retry)
+
+    async def run():
+        for _ in range(3):
+            with pytest.raises(OpenMeteoError, match="HTTP 503"):
+                await client.get_realtime(35.9, 14.5)
+
+    asyncio.run(run())
+    # 3 attempts on the banked retries; then 0.5 earned (refused); then 1.0 (one retry)
+    assert dw.retry_stats()[client.WEATHER_BASE] == {
+        "calls": 3, "attempts": 6, "budget_exhausted": 2,
+        "by_attempts": {"3": 1, "1": 1, "2": 1}, "attempts_per_call": 2.0,
+    }
+
+
+def test_no_retry_past_the_deadline(monkeypatch):
+    monkeypatch.setattr(dw, "_RETRIES", dw._RetryBudget())
+    client = _client(
+        monkeypatch,
+        lambda request: (503, {"reason": "busy"}, {"Retry-After": "30"}),
+        retry=RetryPolicy(),
+        timeouts=TimeoutPolicy(deadline_s=5.0),
+    )
+
+    async def run():
+        with pytest.raises(OpenMeteoError, match="HTTP 503"):
+            await client.get_realtime(35.9, 14.5)
+
+    asyncio.run(run())
+    stats = dw.retry_stats()[client.WEATHER_BASE]
+    assert (stats["attempts"], stats["budget_exhausted"]) == (1, 0)
+
+
+def _sites(request: httpx.Request):
+    sites = request.url.params["latitude"].count(",") + 1
+    one = {"current": {"time": "2024-07-01T12:00"}}
+    return 200, one if sites == 1 else [one] * sites
+
+
+def test_only_single_site_latencies_recorded(monkeypatch):
+    monkeypatch.setattr(dw, "_LATENCY", LatencyTracker(min_samples=1))
+    client = _client(monkeypatch, _sites)
+
+    async def run():
+        await client.get_realtime_many([(35.9, 14.5), (36.0, 14.5)])
+        assert dw.latency_stats() == {}
+        await client.get_realtime(35.9, 14.5)
+
+    asyncio.run(run())
+    assert dw.latency_stats()[client.WEATHER_BASE]["count"] == 1
+
+
+def test_only_single_site_calls_hedged(monkeypatch):
+    monkeypatch.setattr(dw, "_HEDGES", dw._HedgeBudget())
+    hedge = HedgePolicy(delay_s=0.01, max_ratio=1.0)
+    client = _client(monkeypatch, _sites, delay=0.05, hedge=hedge)
+
+    async def run():
+        await client.get_realtime_many([(35.9, 14.5), (36.0, 14.5)])
+        assert dw.hedge_stats() == {}
+        await client.get_realtime(35.9, 14.5)
+
+    asyncio.run(run())
+    assert dw.hedge_stats()[client.WEATHER_BASE]["hedged"] == 1
+
+
+def test_cache_counts_lookups_as_the_clients_act_on_them(wall):
+    cache = ResponseCache(stale_while_revalidate=10.0, stale_if_error=60.0)
+    cache.set("k", {"v": 1}, ttl=5.0)
+    for dt in (0.0, 10.0, 30.0, 70.0):  # fresh, revalidating, error-only, gone
+        wall.now += dt
+        cache.lookup("k")
+    stats = cache.stats()
+    assert (stats["hits"], stats["stale_hits"], stats["misses"]) == (1, 1, 2)
+
+
+def test_stale_entries_cover_refresh_and_upstream_errors(monkeypatch, wall):
+    upstream = {"calls": 0, "up": True}
+
+    def respond(request: httpx.Request):
+        upstream["calls"] += 1
+        return _realtime(request) if upstream["up"] else (500, {"reason": "boom"})
+
+    cache = ResponseCache(current_ttl=60.0, stale_while_revalidate=10.0, stale_if_error=300.0)
+    client = _client(monkeypatch, respond, cache=cache)
+
+    async def run():
+        await client.get_realtime(35.9, 14.5)
+
+        wall.now += 65.0  # inside stale-while-revalidate: served stale, one refresh
+        stale = await asyncio.gather(*(client.get_realtime(35.9, 14.5) for _ in range(3)))
+        assert {r["staleness"]["weather"]["reason"] for r in stale} == {"revalidating"}
+        await asyncio.sleep(0.05)
+        assert upstream["calls"] == 2
+        assert "staleness" not in await client.get_realtime(35.9, 14.5)
+
+        upstream["up"] = False
+        wall.now += 100.0  # past the refresh window, inside stale-if-error
+        fallback = await client.get_realtime(35.9, 14.5)
+        assert fallback["staleness"]["weather"]["reason"] == "upstream_error"
+        assert fallback["weather"]["weather_code"] == 0
+
+        wall.now += 300.0
+        with pytest.raises(OpenMeteoError, match="HTTP 500"):
+            await client.get_realtime(35.9, 14.5)
+
+    asyncio.run(run())
+    assert cache.stats()["error_fallbacks"] == 1
+
+
+KEY = ResponseCache.key(AsyncDiveWiseWeather.WEATHER_BASE, {"latitude": 35.9})
+
+
+@pytest.fixture
+def sqlite_cache(tmp_path):
+    """Opens SQLiteResponseCache instances (workers) on one file; all closed after."""
+    caches = []
+
+    def open_cache(**kwargs) -> SQLiteResponseCache:
+        cache = SQLiteResponseCache(str(tmp_path / "cache.db"), **kwargs)
+        caches.append(cache)
+        return cache
+
+    yield open_cache
+    for cache in caches:
+        cache.close()
+
+
+def test_sqlite_cache_writes_through_for_other_workers(wall, sqlite_cache):
+    first = sqlite_cache()
+    first.set(KEY, {"v": 1}, ttl=60.0)
+    first.flush()
+    assert first.stats()["disk_writes"] == 1
+    assert first.stats()["disk_pending"] == 0
+
+    second = sqlite_cache()
+    assert second.lookup(KEY).payload == {"v": 1}
+    stats = second.stats()
+    assert (stats["hits"], stats["disk_hits"]) == (1, 1)
+    second.lookup(KEY)  # now answered from memory
+    assert second.stats()["disk_hits"] == 1
+
+
+def test_sqlite_cache_prefers_newer_row_over_expired_memory(wall, sqlite_cache):
+    first = sqlite_cache(stale_if_error=60.0)
+    second = sqlite_cache(stale_if_error=60.0)
+    first.set(KEY, {"v": 1}, ttl=5.0)
+    wall.now += 10.0  # first's copy expired; another worker refreshed it
+    second.set(KEY, {"v": 2}, ttl=60.0)
+    second.flush()
+    assert first.lookup(KEY).payload == {"v": 2}
+    assert first.stats()["disk_hits"] == 1
+    assert first.stats()["hits"] == 1
+
+
+def test_sqlite_cache_prunes_rows_past_retention(wall, sqlite_cache):
+    cache = sqlite_cache(stale_if_error=60.0)
+    cache.set(KEY, {"v": 1}, ttl=5.0)
+    cache.flush()
+    wall.now += 30.0
+    assert cache.prune() == 0  # still kept for stale-if-error
+    wall.now += 40.0
+    assert cache.prune() == 1
+
+
+def test_sqlite_cache_corrupt_row_is_a_miss(wall, sqlite_cache):
+    first = sqlite_cache()
+    first.set(KEY, {"v": 1}, ttl=60.0)
+    first.flush()
+    with sqlite3.connect(first.path) as conn:
+        conn.execute("UPDATE responses SET payload = ?", (b"not zlib",))
+
+    second = sqlite_cache()
+    assert second.lookup(KEY) is None
+    stats = second.stats()
+    assert (stats["misses"], stats["disk_errors"]) == (1, 1)
+
+
+LIMIT = RateLimitConfig(rate=10.0, burst=100.0, interactive_reserve=40.0, max_wait_s=30.0)
+
+
+def test_single_site_calls_book_ahead(clock):
+    limiter = RateLimiter(LIMIT)
+    assert [limiter.reserve() for _ in range(100)] == [0.0] * 100
+    assert limiter.reserve() == pytest.approx(0.1)
+    assert limiter.reserve() == pytest.approx(0.2)  # queued behind the previous booking
+    clock.now += 0.2
+    assert limiter.reserve() == pytest.approx(0.1)
+    assert limiter.stats()["queued"] == 3
+
+
+def test_bulk_calls_leave_interactive_reserve(clock):
+    limiter = RateLimiter(LIMIT)
+    assert limiter.reserve(50, bulk=True) == 0.0  # 100 → 50 tokens
+    # 50 more would dip into the reserve: wait until 90 are there, nothing booked
+    assert limiter.reserve(50, bulk=True) == pytest.approx(4.0)
+    assert limiter.reserve(50, bulk=True) == pytest.approx(4.0)
+    assert limiter.stats()["calls"] == 1
+    # single-site calls still find the reserve
+    assert [limiter.reserve() for _ in range(40)] == [0.0] * 40
+    clock.now += 8.0  # 10 + 80 tokens
+    assert limiter.reserve(50, bulk=True) == 0.0
+
+
+def test_bulk_call_above_burst_minus_reserve_waits_for_full_bucket(clock):
+    limiter = RateLimiter(LIMIT)
+    limiter.reserve(30)
+    assert limiter.reserve(80, bulk=True) == pytest.approx(3.0)
+    clock.now += 3.0
+    assert limiter.reserve(80, bulk=True) == 0.0
+
+
+def test_reserve_rejects_waits_past_budget(clock):
+    limiter = RateLimiter(LIMIT)
+    limiter.reserve(100)
+    with pytest.raises(RateLimited):
+        limiter.reserve(50, budget=4.0, bulk=True)
+    with pytest.raises(RateLimited):
+        limiter.reserve(10, budget=0.5)
+    assert limiter.reserve(10, budget=1.0) == pytest.approx(1.0)
+    assert limiter.stats()["rejected"] == 2
+
+
+def test_pause_holds_every_caller(clock):
+    limiter = RateLimiter(LIMIT)
+    limiter.pause(2.0)
+    assert limiter.reserve() == pytest.approx(2.1)
+    assert limiter.reserve(50, bulk=True) == pytest.approx(2.0 + 9.1)
+    assert limiter.stats()["throttled"] == 1
+
+
+class _Upstream(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+
+    def do_GET(self):
+        body = json.dumps({"current": {"time": "2024-07-01T12:00"}}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def upstream():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Upstream)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_async_pool_counts_connection_reuse(upstream, monkeypatch):
+    monkeypatch.setattr(AsyncDiveWiseWeather, "WEATHER_BASE", upstream + "/v1/forecast")
+    pool = PoolConfig(host_pools=1, max_keepalive=2)  # its own client and counters
+    client = AsyncDiveWiseWeather(include_marine=False, pool=pool)
+
+    async def run():
+        for lat in range(3):
+            await client.get_realtime(float(lat), 14.5)
+        await dw.aclose_shared_async_clients()
+
+    asyncio.run(run())
+    assert client.pool_stats() == {"requests": 3, "hits": 2, "misses": 1}
+    assert dw.pool_stats(pool) == {
+        "sync": {"requests": 0, "hits": 0, "misses": 0},
+        "async": {"requests": 3, "hits": 2, "misses": 1},
+    }
+
+
+def _hours(first: int, count: int):
+    return [f"2024-07-01T{hour:02d}:00" for hour in range(first, first + count)]
+
+
+def test_marine_offset_on_shared_grid():
+    offset = AsyncDiveWiseWeather._marine_offset
+    assert offset(_hours(2, 4), _hours(0, 8)) == 2  # marine starts earlier
+    assert offset(_hours(2, 4), _hours(4, 6)) == -2  # marine starts later
+    assert offset(_hours(0, 4), _hours(0, 4)) == 0
+
+
+def test_marine_offset_none_without_shared_grid():
+    offset = AsyncDiveWiseWeather._marine_offset
+    half_hours = [t.replace(":00", ":30") for t in _hours(0, 4)]
+    assert offset(_hours(0, 4), half_hours) is None
+    assert offset(_hours(0, 4), _hours(0, 2) + _hours(3, 2)) is None  # hour missing
+    assert offset(_hours(0, 4), _hours(10, 3)) is None  # no overlap
+    assert offset([], _hours(0, 4)) is None
+    assert offset(_hours(0, 4), []) is None
+
+
+def test_hourly_columns_join_marine_by_time():
+    client = AsyncDiveWiseWeather(include_marine=False)
+    weather = {"hourly": {"time": _hours(0, 4)}}
+
+    later = {"hourly": {"time": _hours(2, 4), "wave_height": [1.0, 1.1, 1.2, 1.3]}}
+    hourly = client._hourly_columns(weather, 1, 4, later)
+    assert list(hourly.column("wave_height_m")) == [None, 1.0, 1.1]
+
+    # an hour missing upstream: no common grid, looked up per timestamp
+    gappy = {"hourly": {"time": _hours(0, 2) + _hours(3, 1), "wave_height": [0.5, 0.6, 0.8]}}
+    hourly = client._hourly_columns(weather, 0, 4, gappy)
+    assert list(hourly.column("wave_height_m")) == [0.5, 0.6, None, 0.8]
+
+    empty = {"hourly": {"time": [], "wave_height": []}}
+    hourly = client._hourly_columns(weather, 0, 4, empty)
+    assert list(hourly.column("wave_height_m")) == [None] * 4
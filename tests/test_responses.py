@@ -0,0 +1,124 @@
+"""
+The trusted response path (TRUST_RESPONSES) must send the same bytes as the
+validated one: every endpoint is called both ways against recorded upstream
+payloads and the bodies are compared.
+"""
+
+import json
+import os
+from typing import Any, Dict, Optional
+
+import pytest
+from fastapi.testclient import TestClient
+
+import app as app_module
+from divewise_weather import AsyncDiveWiseWeather
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+
+
+def _fixture(name: str) -> bytes:
+    with open(os.path.join(FIXTURES, name), "rb") as f:
+        return f.read()
+
+
+async def _fake_get(
+        self, url: str, params: Dict[str, Any], deadline: Optional[float], throttle: bool = False
+) -> Any:
+    """Upstream GET answered from tests/fixtures (one copy per requested site)."""
+    source = "marine" if url == self.MARINE_BASE else "weather"
+    span = "realtime" if "current" in params else "forecast"
+    name = f"{span}_{source}.json" if span == "realtime" else f"forecast_{source}_16d.json"
+    sites = str(params["latitude"]).count(",") + 1
+    if sites == 1:
+        return json.loads(_fixture(name))
+    return [json.loads(_fixture(name)) for _ in range(sites)]
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(AsyncDiveWiseWeather, "_get", _fake_get)
+    with TestClient(app_module.app) as test_client:
+        yield test_client
+
+
+SITE = {"lat": 35.9, "lon": 14.5}
+SITES = {"sites": [{"lat": 35.9 + i / 10, "lon": 14.5} for i in range(3)]}
+
+CALLS = [
+    ("/realtime", SITE),
+    ("/realtime", dict(SITE, include_marine=False)),
+    ("/forecast", dict(SITE, date="2024-07-03")),
+    ("/forecast", dict(SITE, date="2024-07-03", format="columnar", fog_policy="caution")),
+    ("/forecast/range", dict(SITE, start_date="2024-07-01", end_date="2024-07-05")),
+    ("/forecast/windows", dict(SITE, start_date="2024-07-01", end_date="2024-07-03")),
+    ("/realtime/batch", SITES),
+    ("/forecast/batch", dict(SITES, date="2024-07-02")),
+    ("/forecast/batch", dict(SITES, date="2024-07-02", format="columnar")),
+]
+
+
+@pytest.mark.parametrize("path,body", CALLS)
+def test_trusted_responses_match_validated(client, monkeypatch, path, body):
+    monkeypatch.setattr(app_module, "TRUST_RESPONSES", False)
+    validated = client.post(path, json=body)
+    monkeypatch.setattr(app_module, "TRUST_RESPONSES", True)
+    trusted = client.post(path, json=body)
+
+    assert validated.status_code == trusted.status_code == 200
+    assert trusted.content == validated.content
+
+
+SAFETY = {"status": "Unknown", "score": None, "reasons": [], "tips": []}
+
+
+def test_shape_fills_optional_defaults():
+    data = {"coord": {"lat": 1.0, "lon": 2.0}, "weather": {}, "safety": SAFETY}
+    shaped = app_module.shape(app_module.RealtimeResponse, data)
+    assert shaped["marine"] is None
+    assert list(shaped) == list(app_module.RealtimeResponse.model_fields)
+
+
+def test_shape_rejects_missing_required_field():
+    data = {"coord": {"lat": 1.0, "lon": 2.0}, "weather": {}}
+    with pytest.raises(ValueError, match=r"RealtimeResponse\.safety"):
+        app_module.shape(app_module.RealtimeResponse, data)
+    # nested models too; a required Optional field has no default either
+    data["safety"] = {"status": "Safe", "reasons": [], "tips": []}
+    with pytest.raises(ValueError, match=r"SafetyResponse\.score"):
+        app_module.shape(app_module.RealtimeResponse, data)
+
+
+@pytest.mark.parametrize("path,body", [
+    ("/realtime", dict(SITE, lat=999)),
+    ("/forecast", dict(SITE, lon=-181, date="2024-07-03")),
+    ("/realtime/batch", {"sites": [SITE, {"lat": -91, "lon": 0}]}),
+])
+def test_out_of_range_coordinates_rejected(client, path, body):
+    assert client.post(path, json=body).status_code == 422
+
+
+def _sites(n: int) -> list:
+    return [{"lat": round(-60 + i * 0.05, 2), "lon": 14.5} for i in range(n)]
+
+
+def test_batch_size_limits(client):
+    assert client.post("/realtime/batch", json={"sites": _sites(200)}).status_code == 200
+    too_many = {"sites": _sites(201), "date": "2024-07-02"}
+    assert client.post("/forecast/batch", json=too_many).status_code == 422
+
+    streamed = client.post("/realtime/batch", json={"sites": _sites(201), "stream": True})
+    assert streamed.status_code == 200
+    assert len(streamed.text.splitlines()) == 201
+    assert client.post(
+        "/realtime/batch", json={"sites": _sites(app_module.MAX_STREAM_SITES + 1), "stream": True}
+    ).status_code == 422
+
+
+def test_stats(client):
+    client.post("/realtime", json=SITE)
+    stats = client.get("/stats").json()
+    assert set(stats) == {
+        "pool", "cache", "coalesce", "latency", "hedge", "retry", "breaker", "rate_limit",
+    }
+    assert stats["cache"]["misses"] >= 1
@@ -0,0 +1,78 @@
+"""
+RiskEngine's hour-by-hour view: per-hour scores from the hour's own sea state,
+and the safe windows find_windows picks out of a timeline.
+"""
+
+from app import FORECAST_POLICY, RiskEngine
+from divewise_weather import HourlyColumns
+
+DAYLIGHT = {"2024-07-01": ("2024-07-01T06:00", "2024-07-01T20:00")}
+
+
+def _timeline(scores):
+    """Hourly timeline from 2024-07-01T00:00 with the given scores."""
+    return [
+        {
+            "time": f"2024-07-01T{hour:02d}:00",
+            "score": score,
+            "status": RiskEngine._map_status(score, False, FORECAST_POLICY),
+        }
+        for hour, score in enumerate(scores)
+    ]
+
+
+def _starts(windows):
+    return [w["start"] for w in windows]
+
+
+def test_find_windows_drops_short_runs_and_keeps_final_run():
+    timeline = _timeline([0, 0, 30, 0, 30, 0, 0, 0])
+    windows = RiskEngine.find_windows(timeline, min_hours=2)
+    assert _starts(windows) == ["2024-07-01T05:00", "2024-07-01T00:00"]  # longer first
+    assert windows[0]["end"] == "2024-07-01T08:00"
+    assert windows[0]["hours"] == 3
+
+
+def test_find_windows_ranks_daylight_first():
+    # a calm night run, then a breezier run that reaches into daylight
+    timeline = _timeline([0, 0, 0, 0, 70, 0, 10, 10, 70])
+    windows = RiskEngine.find_windows(timeline, min_hours=2, daylight=DAYLIGHT)
+    assert _starts(windows) == ["2024-07-01T05:00", "2024-07-01T00:00"]
+    assert windows[0]["daylight_hours"] == 2
+    assert windows[0]["best_slot"] == {
+        "start": "2024-07-01T06:00", "end": "2024-07-01T08:00",
+        "score": 20, "daylight_hours": 2,
+    }
+    # without daylight the calm night wins
+    assert _starts(RiskEngine.find_windows(timeline, min_hours=2)) == [
+        "2024-07-01T00:00", "2024-07-01T05:00",
+    ]
+
+
+def test_find_windows_keeps_top_k():
+    timeline = _timeline([5, 5, 70, 0, 0, 70, 15, 15, 70, 10, 10])
+    windows = RiskEngine.find_windows(timeline, min_hours=2, top_k=2)
+    assert _starts(windows) == ["2024-07-01T03:00", "2024-07-01T00:00"]
+    assert len(RiskEngine.find_windows(timeline, min_hours=2, top_k=10)) == 4
+
+
+def test_hourly_timeline_uses_each_hours_sea_state():
+    hourly = HourlyColumns({
+        "time": ["2024-07-01T06:00", "2024-07-01T07:00", "2024-07-01T08:00"],
+        "wave_height_m": [0.5, 2.5, 0.5],
+        "swell_wave_height_m": [0.5, 0.5, 2.0],
+    })
+    marine_daily = {"wave_height_max_m": 2.5, "swell_wave_height_max_m": 2.0}
+    timeline = RiskEngine.hourly_timeline(
+        {"hourly": hourly, "marine_daily": marine_daily}, FORECAST_POLICY
+    )
+    assert [(h["score"], h["status"]) for h in timeline] == [
+        (0, "Safe"), (50, "Caution"), (40, "Caution"),
+    ]
+
+    # without hourly marine columns every hour gets the day's maxima
+    weather_only = HourlyColumns({"time": hourly.columns["time"]})
+    timeline = RiskEngine.hourly_timeline(
+        {"hourly": weather_only, "marine_daily": marine_daily}, FORECAST_POLICY
+    )
+    assert [h["score"] for h in timeline] == [90, 90, 90]